@@ -1,7 +1,10 @@
+from paux import bar
+from paux import cache
 from paux import date
 from paux import digit
 from paux import file
 from paux import filter
+from paux import ledger
 from paux import log
 from paux import order
 from paux import param
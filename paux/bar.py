@@ -0,0 +1,256 @@
+from typing import Union
+import re
+import datetime
+import numpy as np
+import paux.date as _date
+from paux import exception
+from paux.cache import Cache
+
+# 每个单位的毫秒数，M（月）按照日历计算
+bar_units = {
+    'm': 60000,
+    'h': 3600000,
+    'H': 3600000,
+    'd': 86400000,
+    'D': 86400000,
+    'w': 604800000,
+    'W': 604800000,
+    'M': None,
+}
+# 周线以周一为起点，1970-01-05是周一
+_week_origin = 4 * 86400000
+
+_bar_cache = Cache(maxsize=256)
+
+
+class Bar():
+    '''
+    K线周期，例如：'1m','3m','5m','30m','1h','2h','4h','6h','1d','1w','1M'
+    边界为本地时间是周期整数倍的时刻：
+        日线以本地零点为边界，夏令时当天为23或25小时，与tomorrow()相同
+        重复的本地时间（夏令时结束）两次均为边界
+        不存在的本地时间（夏令时开始）向后顺延，与pendulum相同
+    '''
+
+    def __init__(self, bar: str):
+        '''
+        :param bar: K线周期
+        '''
+        match = re.fullmatch(r'(\d+)([a-zA-Z])', bar) if isinstance(bar, str) else None
+        if not match or match.group(2) not in bar_units or int(match.group(1)) <= 0:
+            raise exception.ParamBarException(bar)
+        self.bar = bar
+        self.number = int(match.group(1))
+        self.unit = match.group(2)
+        if self.unit == 'M':
+            self.step = None
+            self.origin = 0
+        else:
+            self.step = self.number * bar_units[self.unit]
+            self.origin = _week_origin if self.unit in 'wW' else 0
+
+    def __repr__(self):
+        return 'Bar({bar})'.format(bar=repr(self.bar))
+
+    # 本地时间（按UTC计算的毫秒数）所在周期的索引
+    def _get_index(self, wall: np.ndarray) -> np.ndarray:
+        if self.step is None:
+            months = wall.astype('datetime64[ms]').astype('datetime64[M]').astype(np.int64)
+            return months // self.number
+        return (wall - self.origin) // self.step
+
+    # 周期索引对应的本地时间（按UTC计算的毫秒数）
+    def _get_wall(self, index: np.ndarray) -> np.ndarray:
+        if self.step is None:
+            months = (index * self.number).astype('datetime64[M]')
+            return months.astype('datetime64[ms]').astype(np.int64)
+        return index * self.step + self.origin
+
+    # 本地时间对应的时间戳，重复的本地时间返回两次的时间戳
+    @staticmethod
+    def _resolve(wall: np.ndarray, timezone):
+        return _date._wall_to_ts(wall, timezone, fold=0), _date._wall_to_ts(wall, timezone, fold=1)
+
+    # 向下圆整到周期边界
+    def floor(
+            self,
+            ts,
+            timezone: str = None
+    ) -> np.ndarray:
+        '''
+        :param ts: 毫秒时间戳序列
+        :param timezone: 时区 None使用本地默认时区
+        :return: np.ndarray[int64] 时间戳所在周期的起始时间戳
+        '''
+        timezone = _date._to_pd_timezone(timezone)
+        ts = _to_ts_array(ts, timezone)
+        wall = ts + _date._get_utc_offsets(ts, timezone)
+        first, second = self._resolve(self._get_wall(self._get_index(wall)), timezone)
+        return np.where(second <= ts, second, first)
+
+    # 向上圆整到周期边界
+    def ceil(
+            self,
+            ts,
+            timezone: str = None
+    ) -> np.ndarray:
+        '''
+        :param ts: 毫秒时间戳序列
+        :param timezone: 时区 None使用本地默认时区
+        :return: np.ndarray[int64] 大于等于时间戳的第一个周期边界
+        '''
+        timezone = _date._to_pd_timezone(timezone)
+        ts = _to_ts_array(ts, timezone)
+        wall = ts + _date._get_utc_offsets(ts, timezone)
+        index = self._get_index(wall)
+        first, second = self._resolve(self._get_wall(index), timezone)
+        next_first, next_second = self._resolve(self._get_wall(index + 1), timezone)
+        # 夏令时结束时本地时间回拨，按照回拨后的偏移再取一次边界
+        later_wall = ts + _date._get_utc_offsets(next_second, timezone)
+        later_index = self._get_index(later_wall)
+        later_index += self._get_wall(later_index) < later_wall
+        later = self._resolve(self._get_wall(later_index), timezone)[1]
+        result = np.full(len(ts), np.iinfo(np.int64).max, dtype=np.int64)
+        for candidate in (second, next_first, next_second, later):
+            result = np.where(candidate > ts, np.minimum(candidate, result), result)
+        return np.where((first == ts) | (second == ts), ts, result)
+
+    # 区间内的周期边界
+    def range(
+            self,
+            start: Union[int, float, str, datetime.date],
+            end: Union[int, float, str, datetime.date],
+            timezone: str = None
+    ) -> np.ndarray:
+        '''
+        :param start: 起始日期时间 (包含起始)
+        :param end: 终止日期时间 （包含终止）
+        :param timezone: 时区 None使用本地默认时区
+        :return: np.ndarray[int64] 区间内全部周期的起始时间戳
+        '''
+        start = _to_ts(start, timezone)
+        end = _to_ts(end, timezone)
+        timezone = _date._to_pd_timezone(timezone)
+        if start > end:
+            return np.array([], dtype=np.int64)
+        bounds = np.array([start, end], dtype=np.int64)
+        start_index, end_index = self._get_index(bounds + _date._get_utc_offsets(bounds, timezone))
+        walls = self._get_wall(np.arange(start_index - 1, end_index + 2, dtype=np.int64))
+        first, second = self._resolve(walls, timezone)
+        result = np.unique(np.concatenate([first, second]))
+        return result[(result >= start) & (result <= end)]
+
+    # 缺失的周期
+    def missing(
+            self,
+            ts,
+            start: Union[int, float, str, datetime.date] = None,
+            end: Union[int, float, str, datetime.date] = None,
+            timezone: str = None
+    ) -> np.ndarray:
+        '''
+        :param ts: 已有的毫秒时间戳序列
+        :param start: 起始日期时间 None使用ts中最小的时间戳
+        :param end: 终止日期时间 None使用ts中最大的时间戳
+        :param timezone: 时区 None使用本地默认时区
+        :return: np.ndarray[int64] 区间内ts没有覆盖的周期的起始时间戳
+        '''
+        exist = np.unique(self.floor(ts, timezone))
+        if start is None and end is None and len(exist) == 0:
+            return np.array([], dtype=np.int64)
+        start = exist[0] if start is None else _to_ts(start, timezone)
+        end = exist[-1] if end is None else _to_ts(end, timezone)
+        return np.setdiff1d(self.range(start, end, timezone), exist, assume_unique=True)
+
+
+# 转化为毫秒时间戳，支持numpy数字
+def _to_ts(date, timezone=None) -> int:
+    if isinstance(date, (np.integer, np.floating)):
+        return int(date)
+    return _date.to_ts(date, timezone)
+
+
+# 转化为毫秒时间戳数组
+def _to_ts_array(ts, timezone=None) -> np.ndarray:
+    values = np.asarray(ts)
+    if values.ndim == 0:
+        values = values.reshape(1)
+    if values.dtype.kind in 'iuf':
+        return values.astype(np.int64)
+    return _date.to_ts_array(values, timezone)
+
+
+# 获取K线周期对象，相同的bar只解析一次
+def get_bar(bar: Union[str, Bar]) -> Bar:
+    '''
+    :param bar: K线周期，例如：'1m','1h','1d'
+    '''
+    if isinstance(bar, Bar):
+        return bar
+    bar_obj = _bar_cache.get(bar)
+    if bar_obj is None:
+        bar_obj = Bar(bar)
+        _bar_cache.set(bar, bar_obj)
+    return bar_obj
+
+
+# 向下圆整到周期边界
+def floor_ts(ts, bar: Union[str, Bar], timezone: str = None) -> np.ndarray:
+    '''
+    :param ts: 毫秒时间戳序列
+    :param bar: K线周期
+    :param timezone: 时区 None使用本地默认时区
+    例如：
+        floor_ts(ts=[1641092645000], bar='4h', timezone='America/New_York')
+    '''
+    return get_bar(bar).floor(ts, timezone)
+
+
+# 向上圆整到周期边界
+def ceil_ts(ts, bar: Union[str, Bar], timezone: str = None) -> np.ndarray:
+    '''
+    :param ts: 毫秒时间戳序列
+    :param bar: K线周期
+    :param timezone: 时区 None使用本地默认时区
+    例如：
+        ceil_ts(ts=[1641092645000], bar='15m', timezone='America/New_York')
+    '''
+    return get_bar(bar).ceil(ts, timezone)
+
+
+# 得到区间内的周期边界
+def get_range_bars(
+        start: Union[int, float, str, datetime.date],
+        end: Union[int, float, str, datetime.date],
+        bar: Union[str, Bar],
+        timezone: str = None
+) -> np.ndarray:
+    '''
+    :param start: 起始日期时间 (包含起始)
+    :param end: 终止日期时间 （包含终止）
+    :param bar: K线周期
+    :param timezone: 时区 None使用本地默认时区
+    例如：
+        get_range_bars(start='2021-11-06', end='2021-11-08', bar='1h', timezone='America/New_York')
+    '''
+    return get_bar(bar).range(start, end, timezone)
+
+
+# 得到缺失的周期
+def get_missing_bars(
+        ts,
+        bar: Union[str, Bar],
+        start: Union[int, float, str, datetime.date] = None,
+        end: Union[int, float, str, datetime.date] = None,
+        timezone: str = None
+) -> np.ndarray:
+    '''
+    :param ts: 已有的毫秒时间戳序列
+    :param bar: K线周期
+    :param start: 起始日期时间 None使用ts中最小的时间戳
+    :param end: 终止日期时间 None使用ts中最大的时间戳
+    :param timezone: 时区 None使用本地默认时区
+    例如：
+        get_missing_bars(ts=df['ts'], bar='1m', timezone='Asia/Shanghai')
+    '''
+    return get_bar(bar).missing(ts, start, end, timezone)
@@ -0,0 +1,104 @@
+from collections import OrderedDict
+import threading
+
+
+class Cache():
+    def __init__(self, maxsize: int = 1024):
+        '''
+        :param maxsize: 缓存数量上限，超过上限时淘汰最久未使用的对象
+        '''
+        self.maxsize = maxsize
+        self.hits = 0  # 命中次数
+        self.misses = 0  # 未命中次数
+        self.evictions = 0  # 淘汰次数
+        self.cache_map = OrderedDict()
+        self.lock = threading.Lock()
+
+    # 获取缓存对象
+    def get(self, key, default=None):
+        '''
+        :param key: 缓存键
+        :param default: 未命中时的返回值
+        '''
+        with self.lock:
+            try:
+                value = self.cache_map[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self.cache_map.move_to_end(key)
+            self.hits += 1
+            return value
+
+    # 设置缓存对象
+    def set(self, key, value):
+        '''
+        :param key: 缓存键
+        :param value: 缓存值
+        '''
+        with self.lock:
+            self.cache_map[key] = value
+            self.cache_map.move_to_end(key)
+            while len(self.cache_map) > self.maxsize:
+                self.cache_map.popitem(last=False)
+                self.evictions += 1
+
+    # 删除缓存对象
+    def delete(self, key):
+        '''
+        :param key: 缓存键
+        :return:
+            True:   删除成功
+            False:  缓存中不存在
+        '''
+        with self.lock:
+            if key in self.cache_map:
+                del self.cache_map[key]
+                return True
+            return False
+
+    # 修改缓存数量上限，立即淘汰超出的对象
+    def resize(self, maxsize: int):
+        '''
+        :param maxsize: 缓存数量上限
+        '''
+        with self.lock:
+            self.maxsize = maxsize
+            while len(self.cache_map) > self.maxsize:
+                self.cache_map.popitem(last=False)
+                self.evictions += 1
+
+    # 清空缓存与计数
+    def clear(self):
+        with self.lock:
+            self.cache_map.clear()
+            self.hits = 0
+            self.misses = 0
+            self.evictions = 0
+
+    # 缓存统计信息
+    def info(self) -> dict:
+        '''
+        :return:
+            {
+                'hits' : <int>,
+                'misses' : <int>,
+                'evictions' : <int>,
+                'size' : <int>,
+                'maxsize' : <int>,
+            }
+        '''
+        with self.lock:
+            return dict(
+                hits=self.hits,
+                misses=self.misses,
+                evictions=self.evictions,
+                size=len(self.cache_map),
+                maxsize=self.maxsize,
+            )
+
+    def __len__(self):
+        return len(self.cache_map)
+
+    def __contains__(self, key):
+        return key in self.cache_map
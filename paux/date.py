@@ -1,9 +1,22 @@
 from typing import Union
 import re
+import copy
+import bisect
 import pendulum
+from pendulum.tz.timezone import FixedTimezone
 import datetime
+import numpy as np
 import pandas as pd
 from paux import exception
+from paux.cache import Cache
+
+try:
+    import zoneinfo
+except ImportError:
+    try:
+        from backports import zoneinfo
+    except ImportError:
+        zoneinfo = None
 
 # 日期时间
 date_patterns = [
@@ -23,14 +36,234 @@ time_patterns = [
 ]
 
 
+# 缓存
+caches = {
+    'pattern': Cache(maxsize=256),  # 编译后的正则与模板
+    'timezone': Cache(maxsize=256),  # 时区对象
+    'ts': Cache(maxsize=4096),  # 字符串 -> 毫秒时间戳
+    'datetime': Cache(maxsize=4096),  # 字符串 -> 日期时间对象
+    'period': Cache(maxsize=256),  # 时间段 -> PeriodSet
+    'calendar': Cache(maxsize=64),  # 时区 -> CalendarTable
+}
+
+
+# 获取缓存统计信息
+def get_cache_info() -> dict:
+    '''
+    :return:
+        {
+            '<name>': {'hits': <int>, 'misses': <int>, 'evictions': <int>, 'size': <int>, 'maxsize': <int>},
+        }
+    '''
+    return {name: cache.info() for name, cache in caches.items()}
+
+
+# 清空缓存，name为None时清空全部缓存
+def clear_cache(name: str = None):
+    '''
+    :param name: 缓存名称 pattern|timezone|ts|datetime|period|calendar
+    '''
+    for cache_name, cache in caches.items():
+        if name is None or name == cache_name:
+            cache.clear()
+
+
+# 编译正则
+def _compile_pattern(pattern: str):
+    compiled = caches['pattern'].get(pattern)
+    if compiled is None:
+        compiled = re.compile(pattern)
+        caches['pattern'].set(pattern, compiled)
+    return compiled
+
+
+# 获取时区对象，None表示本地默认时区，保持为None
+def _get_timezone(timezone=None):
+    if not isinstance(timezone, str):
+        return timezone
+    tz = caches['timezone'].get(timezone)
+    if tz is None:
+        tz = pendulum.timezone(timezone)
+        caches['timezone'].set(timezone, tz)
+    return tz
+
+
+# pendulum后端，返回pendulum对象
+class PendulumBackend():
+    name = 'pendulum'
+
+    @staticmethod
+    def get_timezone(timezone=None):
+        return _get_timezone(timezone)
+
+    @staticmethod
+    def from_format(date: str, fmt: str, tz=None):
+        return pendulum.from_format(date, fmt, tz=_get_timezone(tz))
+
+    @staticmethod
+    def datetime(year: int, month: int, day: int, hour: int = 0, minute: int = 0, second: int = 0, tz=None):
+        return pendulum.datetime(
+            year=year, month=month, day=day, hour=hour, minute=minute, second=second, tz=_get_timezone(tz)
+        )
+
+    @staticmethod
+    def from_timestamp(timestamp: float, tz=None):
+        return pendulum.from_timestamp(timestamp, tz=_get_timezone(tz))
+
+    @staticmethod
+    def time(hour: int, minute: int, second: int):
+        return pendulum.time(hour=hour, minute=minute, second=second)
+
+
+# 标准库zoneinfo后端，返回datetime对象，与pendulum后端的结果相同
+class ZoneinfoBackend():
+    name = 'zoneinfo'
+
+    @staticmethod
+    def get_timezone(timezone=None):
+        if not isinstance(timezone, str):
+            return timezone
+        key = ('zoneinfo', timezone)
+        tz = caches['timezone'].get(key)
+        if tz is None:
+            tz = zoneinfo.ZoneInfo(timezone)
+            caches['timezone'].set(key, tz)
+        return tz
+
+    # fmt中每个格式符的位置 [(token, start, end), ...]，格式符的宽度与字符串中的宽度相同
+    @staticmethod
+    def _get_fmt_fields(fmt: str) -> list:
+        key = ('fields', fmt)
+        fields = caches['pattern'].get(key)
+        if fields is None:
+            fields = [(m.group(0), m.start(), m.end()) for m in re.finditer('YYYY|MM|DD|HH|mm|ss', fmt)]
+            caches['pattern'].set(key, fields)
+        return fields
+
+    @staticmethod
+    def from_format(date: str, fmt: str, tz=None):
+        values = {'YYYY': 1970, 'MM': 1, 'DD': 1, 'HH': 0, 'mm': 0, 'ss': 0}
+        if len(date) == len(fmt):
+            for token, start, end in ZoneinfoBackend._get_fmt_fields(fmt):
+                values[token] = int(date[start:end])
+        else:
+            parsed = datetime.datetime.strptime(date, _to_strftime(fmt))
+            values.update(YYYY=parsed.year, MM=parsed.month, DD=parsed.day,
+                          HH=parsed.hour, mm=parsed.minute, ss=parsed.second)
+        return ZoneinfoBackend.datetime(
+            values['YYYY'], values['MM'], values['DD'], values['HH'], values['mm'], values['ss'], tz=tz
+        )
+
+    @staticmethod
+    def datetime(year: int, month: int, day: int, hour: int = 0, minute: int = 0, second: int = 0, tz=None):
+        # 没有时区返回naive对象，与pendulum相同
+        if tz is None:
+            return datetime.datetime(year, month, day, hour, minute, second, fold=1)
+        tz = ZoneinfoBackend.get_timezone(tz)
+        date = datetime.datetime(year, month, day, hour, minute, second, tzinfo=tz, fold=1)
+        ret_date = date.astimezone(datetime.timezone.utc).astimezone(tz)
+        # 不存在的本地时间向后顺延，与pendulum相同
+        if ret_date.replace(tzinfo=None) != date.replace(tzinfo=None):
+            ret_date = datetime.datetime.fromtimestamp(date.replace(fold=0).timestamp(), tz=tz)
+        return ret_date
+
+    @staticmethod
+    def from_timestamp(timestamp: float, tz=None):
+        # 没有时区使用本地默认时区
+        if tz is None:
+            return datetime.datetime.fromtimestamp(timestamp, tz=datetime.timezone.utc).astimezone()
+        return datetime.datetime.fromtimestamp(timestamp, tz=ZoneinfoBackend.get_timezone(tz))
+
+    @staticmethod
+    def time(hour: int, minute: int, second: int):
+        return datetime.time(hour=hour, minute=minute, second=second)
+
+
+backends = {
+    'pendulum': PendulumBackend,
+    'zoneinfo': ZoneinfoBackend,
+}
+_backend = PendulumBackend
+
+
+# 设置日期转换的后端
+def set_backend(name: str):
+    '''
+    :param name: 后端名称
+        pendulum:   默认，返回pendulum对象
+        zoneinfo:   标准库datetime与zoneinfo，速度更快，返回datetime对象
+                    Python3.9以下需要安装backports.zoneinfo
+    '''
+    global _backend
+    if name not in backends:
+        raise exception.ParamException('backend must in {names}'.format(names=list(backends.keys())))
+    if name == 'zoneinfo' and zoneinfo is None:
+        raise exception.ExecuteException('zoneinfo is not available, please install backports.zoneinfo')
+    _backend = backends[name]
+
+
+# 获取当前后端名称
+def get_backend() -> str:
+    return _backend.name
+
+
 # 将日期时间格式的字符串转化为日期对象，转化不成功返回None
 def __to_datetime_by_pattern(date: str, fmt_patterns: list, timezone: str = None):
     for fmt, pattern in fmt_patterns:
-        if re.match(pattern, date):
-            return pendulum.from_format(date, fmt, tz=timezone)
+        if _compile_pattern(pattern).match(date):
+            return _backend.from_format(date, fmt, tz=timezone)
     return None
 
 
+# 将pendulum的格式转化为strftime格式，例如：'YYYY-MM-DD HH:mm:ss' -> '%Y-%m-%d %H:%M:%S'
+def _to_strftime(fmt: str) -> str:
+    tokens = {'YYYY': '%Y', 'MM': '%m', 'DD': '%d', 'HH': '%H', 'mm': '%M', 'ss': '%S'}
+    return re.sub('YYYY|MM|DD|HH|mm|ss', lambda m: tokens[m.group(0)], fmt)
+
+
+# 将时区转化为pandas可以识别的时区，None使用本地默认时区
+def _to_pd_timezone(timezone=None):
+    if timezone is None:
+        timezone = pendulum.local_timezone()
+    if isinstance(timezone, FixedTimezone):
+        return datetime.timezone(datetime.timedelta(seconds=timezone.offset))
+    if isinstance(timezone, str) or not hasattr(timezone, 'name'):
+        return timezone
+    return timezone.name
+
+
+# 毫秒时间戳数组在时区中的UTC偏移（毫秒）
+def _get_utc_offsets(ts: np.ndarray, timezone=None) -> np.ndarray:
+    ts = np.asarray(ts, dtype=np.int64)
+    local = pd.to_datetime(ts, unit='ms', utc=True).tz_convert(_to_pd_timezone(timezone)).tz_localize(None)
+    return local.to_numpy().astype('datetime64[ms]').astype(np.int64) - ts
+
+
+# 将时区中的本地时间（按UTC计算的毫秒数）转化为毫秒时间戳数组
+def _wall_to_ts(wall: np.ndarray, timezone=None, fold: int = 1) -> np.ndarray:
+    '''
+    :param wall: 本地时间，以UTC计算的毫秒数
+    :param timezone: 时区
+    :param fold: 重复的本地时间（夏令时结束）使用哪一次
+        0:  第一次（夏令时）
+        1:  第二次（标准时间），与pendulum相同
+    不存在的本地时间（夏令时开始）：
+        指定时区时向后顺延，与pendulum相同
+        本地默认时区按照naive datetime的fold计算，与pendulum返回的naive对象的timestamp()相同
+    '''
+    wall = np.asarray(wall, dtype=np.int64)
+    day = 86400000
+    offset1 = _get_utc_offsets(wall - day, timezone)  # 转换前的偏移
+    offset2 = _get_utc_offsets(wall + day, timezone)  # 转换后的偏移
+    ts1 = wall - offset1
+    ts2 = wall - offset2
+    valid1 = _get_utc_offsets(ts1, timezone) == offset1
+    valid2 = _get_utc_offsets(ts2, timezone) == offset2
+    gap_later = timezone is None and bool(fold)
+    later = np.where(valid1 & valid2, bool(fold), ~valid1 & (valid2 | gap_later))
+    return np.where(later, ts2, ts1)
+
+
 def tomorrow(
         date: Union[int, float, str, datetime.date],
         timezone: str = None,
@@ -39,7 +272,7 @@ def tomorrow(
     date2 = datetime.datetime(year=date.year, month=date.month, day=date.day, hour=date.hour, minute=date.minute,
                               second=date.second)  # datetime.datetime类型
     date3 = date2 + datetime.timedelta(days=1)  # datetime.datetime类型
-    next_day = pendulum.datetime(
+    next_day = _backend.datetime(
         year=date3.year,
         month=date3.month,
         day=date3.day,
@@ -89,7 +322,7 @@ def to_ts(
         ts = int(date.timestamp() * 1000)
     # 日期
     elif isinstance(date, datetime.date):
-        ts = int(pendulum.datetime(
+        ts = int(_backend.datetime(
             year=date.year,
             month=date.month,
             day=date.day,
@@ -97,19 +330,275 @@ def to_ts(
         ).timestamp() * 1000)
     # 字符串
     elif isinstance(date, str):
-        ret_date = __to_datetime_by_pattern(date, date_patterns, timezone)
-        # 转换成功
-        if ret_date:
-            ts = int(ret_date.timestamp() * 1000)
-        # 转化失败
-        else:
-            raise exception.DatePatternException(date, date_patterns)
+        key = (date, timezone)
+        ts = caches['ts'].get(key)
+        if ts is None:
+            ret_date = __to_datetime_by_pattern(date, date_patterns, timezone)
+            # 转换成功
+            if ret_date:
+                ts = int(ret_date.timestamp() * 1000)
+                caches['ts'].set(key, ts)
+            # 转化失败
+            else:
+                raise exception.DatePatternException(date, date_patterns)
     # 未知数据类型
     else:
         raise exception.DateTypeException(date)
     return ts
 
 
+# 获取正则对应的逐字符模板
+def _get_pattern_template(pattern: str):
+    key = ('template', pattern)
+    cached = caches['pattern'].get(key)
+    if cached is None:
+        cached = (_parse_pattern_template(pattern),)
+        caches['pattern'].set(key, cached)
+    return cached[0]
+
+
+# 将固定宽度的正则（例如：'^\d{4}-\d{2}-\d{2}$'）转化为逐字符模板，None表示数字，无法转化返回None
+def _parse_pattern_template(pattern: str):
+    match = re.fullmatch(r'\^((?:\\d(?:\{\d+\})?|\\[^\w\s]|[^\\.^$*+?{}\[\]|()])*)\$', pattern)
+    if not match:
+        return None
+    template = []
+    for digit, count, literal in re.findall(r'(\\d)(?:\{(\d+)\})?|\\?(.)', match.group(1)):
+        if digit:
+            template += [None] * int(count or 1)
+        else:
+            template.append(literal)
+    return template
+
+
+# 两个模板是否可能匹配同一个字符串
+def _is_template_overlap(template1: list, template2: list) -> bool:
+    if len(template1) != len(template2):
+        return False
+    for c1, c2 in zip(template1, template2):
+        if c1 is None and c2 is None:
+            continue
+        if c1 is None or c2 is None:
+            if not (c1 or c2).isdigit():
+                return False
+        elif c1 != c2:
+            return False
+    return True
+
+
+# 使用模板逐字符匹配字符串序列，仅识别ASCII数字，其余情况交给逐元素识别
+def _match_template(series: pd.Series, template: list):
+    '''
+    :return: (mask, codes) codes为匹配行的字符编码矩阵
+    '''
+    width = len(template)
+    mask = (series.str.len() == width).to_numpy(dtype=bool, copy=True)
+    if not mask.any():
+        return mask, np.zeros((0, width), dtype=np.int64)
+    codes = np.array(series[mask].tolist(), dtype='U{}'.format(width)).view(np.uint32).reshape(-1, width)
+    is_digit = np.array([c is None for c in template])
+    digits = codes[:, is_digit]
+    ok = ((digits >= ord('0')) & (digits <= ord('9'))).all(axis=1)
+    literals = np.array([ord(c) for c in template if c is not None], dtype=np.uint32)
+    ok &= (codes[:, ~is_digit] == literals).all(axis=1)
+    mask[mask] = ok
+    return mask, codes[ok].astype(np.int64) - ord('0')
+
+
+# 根据字符编码矩阵直接计算本地时间（按UTC计算的毫秒数），fmt与模板不对应时返回None
+def _parse_template_codes(codes: np.ndarray, fmt: str, template: list):
+    '''
+    :return: (valid, wall) valid为日期合法的行
+    '''
+    if len(fmt) != len(template):
+        return None
+    widths = {'YYYY': 4, 'MM': 2, 'DD': 2, 'HH': 2, 'mm': 2, 'ss': 2}
+    fields = {'YYYY': 1970, 'MM': 1, 'DD': 1, 'HH': 0, 'mm': 0, 'ss': 0}
+    token_positions = set()
+    for m in re.finditer('YYYY|MM|DD|HH|mm|ss', fmt):
+        positions = range(m.start(), m.start() + widths[m.group(0)])
+        if any(template[i] is not None for i in positions):
+            return None
+        token_positions.update(positions)
+        value = np.zeros(len(codes), dtype=np.int64)
+        for i in positions:
+            value = value * 10 + codes[:, i]
+        fields[m.group(0)] = value
+    for i, c in enumerate(template):
+        if i not in token_positions and c != fmt[i]:
+            return None
+    year, month, day = fields['YYYY'], fields['MM'], fields['DD']
+    hour, minute, second = fields['HH'], fields['mm'], fields['ss']
+    month_index = np.clip(month, 1, 12)
+    months = np.asarray(year * 12 + month_index - 1 - 1970 * 12).astype('datetime64[M]')
+    first_day = months.astype('datetime64[D]')
+    month_days = ((months + 1).astype('datetime64[D]') - first_day).astype(np.int64)
+    valid = (
+            (year >= 1) & (month >= 1) & (month <= 12) & (day >= 1) & (day <= month_days) &
+            (hour <= 23) & (minute <= 59) & (second <= 59)
+    )
+    wall = (
+            first_day.astype('datetime64[ms]').astype(np.int64) +
+            (day - 1) * 86400000 + hour * 3600000 + minute * 60000 + second * 1000
+    )
+    return valid, wall
+
+
+# 从样本中识别出现最多的date_patterns索引，无法识别返回None
+def _sniff_pattern(series: pd.Series, sample_size: int = 100):
+    counts = [0] * len(date_patterns)
+    for date in series.iloc[:sample_size]:
+        for index, (fmt, pattern) in enumerate(date_patterns):
+            if _compile_pattern(pattern).match(date):
+                counts[index] += 1
+                break
+    if max(counts, default=0) == 0:
+        return None
+    return counts.index(max(counts))
+
+
+# 转换匹配date_patterns[index]的行，并且排除会被靠前的pattern优先匹配的行
+def _parse_pattern(series: pd.Series, index: int):
+    '''
+    :return: (mask, wall) mask为转换成功的行，wall为这些行的本地时间（按UTC计算的毫秒数）
+    '''
+    fmt, pattern = date_patterns[index]
+    template = _get_pattern_template(pattern)
+    if template is None:
+        mask = series.str.match(pattern).to_numpy(dtype=bool, copy=True)
+        codes = None
+    else:
+        mask, codes = _match_template(series, template)
+    # 排除靠前的pattern能够匹配的行
+    keep = np.ones(mask.sum(), dtype=bool)
+    for prior_fmt, prior_pattern in date_patterns[:index]:
+        prior_template = _get_pattern_template(prior_pattern)
+        if template and prior_template and not _is_template_overlap(template, prior_template):
+            continue
+        keep &= ~series[mask].str.match(prior_pattern).to_numpy(dtype=bool)
+    parsed = _parse_template_codes(codes, fmt, template) if codes is not None else None
+    if parsed is None:
+        mask[mask] = keep
+        dates = pd.to_datetime(series[mask], format=_to_strftime(fmt))
+        return mask, dates.to_numpy().astype('datetime64[ms]').astype(np.int64)
+    # 日期不合法的行交给逐元素识别
+    valid, wall = parsed
+    keep &= valid
+    mask[mask] = keep
+    return mask, wall[keep]
+
+
+# 将日期时间格式的字符串数组转化为毫秒时间戳数组
+def _strings_to_ts(strings: np.ndarray, timezone: str = None, sniff: bool = True) -> np.ndarray:
+    '''
+    :param strings: 字符串数组
+    :param timezone: 时区
+    :param sniff: 是否根据样本识别格式
+        True:   用样本识别出的格式转换整列，只对不匹配的行逐元素识别
+        False:  逐元素识别格式
+    '''
+    series = pd.Series(strings, dtype=object)
+    wall = np.zeros(len(series), dtype=np.int64)
+    remain = np.ones(len(series), dtype=bool)
+    if sniff:
+        index = _sniff_pattern(series)
+        if index is not None:
+            mask, sniff_wall = _parse_pattern(series, index)
+            wall[mask] = sniff_wall
+            remain &= ~mask
+    # 逐元素识别
+    for fmt, pattern in date_patterns:
+        if not remain.any():
+            break
+        mask = remain.copy()
+        mask[remain] = series[remain].str.match(pattern).to_numpy(dtype=bool, copy=True)
+        if mask.any():
+            dates = pd.to_datetime(series[mask], format=_to_strftime(fmt))
+            wall[mask] = dates.to_numpy().astype('datetime64[ms]').astype(np.int64)
+            remain &= ~mask
+    # 存在无法匹配的字符串
+    if remain.any():
+        raise exception.DatePatternException(series[remain].iloc[0], date_patterns)
+    return _wall_to_ts(wall, timezone)
+
+
+# 批量转化为毫秒时间戳
+def to_ts_array(
+        dates,
+        timezone: str = None,
+        default: Union[int, float] = 0,
+        sniff: bool = True
+) -> np.ndarray:
+    '''
+    :param dates: 日期序列 list|np.ndarray|pd.Series，元素类型同to_ts
+    :param timezone: 时区
+    :param default: 默认值
+    :param sniff: 字符串是否根据样本识别格式后整列转换，不匹配的行仍逐元素识别，支持的格式不变
+    :return: np.ndarray[int64] 毫秒时间戳
+    例如：
+        to_ts_array(dates=['2022-01-02 03:04:05', '01/02/2022', None], timezone=None, default=0)
+        to_ts_array(dates=np.array([1641092645000, 1641092645000.0]), timezone=None, default=0)
+        to_ts_array(dates=df['date'], timezone='America/New_York', default=0)
+    '''
+    if isinstance(dates, pd.Series):
+        values = dates.to_numpy()
+    elif isinstance(dates, np.ndarray):
+        values = dates
+    # 其他序列按照元素转换，不推断为datetime64，无时区的datetime与to_ts相同按照本地时间计算
+    else:
+        dates = list(dates)
+        values = np.empty(len(dates), dtype=object)
+        values[:] = dates
+    result = np.full(len(values), default, dtype=np.int64)
+    if len(values) == 0:
+        return result
+    # 数字
+    if values.dtype.kind in 'biuf':
+        null_mask = pd.isna(values) | (values == 0)
+        result[~null_mask] = values[~null_mask].astype(np.int64)
+        return result
+    # 日期时间 datetime64（np.ndarray或pd.Series），与pd.Timestamp.timestamp()相同，无时区按照UTC计算
+    if values.dtype.kind == 'M' or isinstance(values.dtype, pd.DatetimeTZDtype):
+        series = pd.Series(values)
+        if series.dt.tz is not None:
+            series = series.dt.tz_convert('UTC').dt.tz_localize(None)
+        null_mask = series.isna().to_numpy()
+        ts = series.to_numpy().astype('datetime64[ms]').astype(np.int64)
+        result[~null_mask] = ts[~null_mask]
+        return result
+    # 混合类型，按照元素类型分组转换
+    values = values.astype(object)
+    null_mask = pd.isna(values)
+    codes, types = pd.factorize(pd.Series(values).map(type))
+    for code, t in enumerate(types):
+        mask = ~null_mask & (codes == code)
+        if not mask.any():
+            continue
+        group = values[mask]
+        # 字符串
+        if issubclass(t, str):
+            empty = group == ''
+            ts = np.full(len(group), default, dtype=np.int64)
+            ts[~empty] = _strings_to_ts(group[~empty], timezone, sniff)
+        # 数字对象
+        elif issubclass(t, (int, float, np.integer, np.floating)):
+            group = group.astype(np.float64) if issubclass(t, (float, np.floating)) else group.astype(np.int64)
+            ts = np.where(group == 0, default, group).astype(np.int64)
+        # 日期时间，timestamp()的调用开销很小，保持与to_ts相同的时区处理
+        elif issubclass(t, datetime.datetime):
+            ts = (np.fromiter((d.timestamp() for d in group), dtype=np.float64, count=len(group)) * 1000).astype(
+                np.int64)
+        # 日期
+        elif issubclass(t, datetime.date):
+            wall = group.astype('datetime64[D]').astype('datetime64[ms]').astype(np.int64)
+            ts = _wall_to_ts(wall, timezone)
+        # 未知数据类型
+        else:
+            raise exception.DateTypeException(group[0])
+        result[mask] = ts
+    return result
+
+
 # 转化为日期时间对象
 def to_datetime(
         date: Union[int, float, str, datetime.date],
@@ -136,22 +625,26 @@ def to_datetime(
     '''
     # 数字对象
     if isinstance(date, int) or isinstance(date, float):
-        ret_date = pendulum.from_timestamp(int(date) / 1000, tz=timezone)
+        ret_date = _backend.from_timestamp(int(date) / 1000, tz=timezone)
     # 字符串对象
     elif isinstance(date, str):
-        ret_date = __to_datetime_by_pattern(date, date_patterns, timezone)
-        if not ret_date:
-            raise exception.DatePatternException(date, date_patterns)
+        key = (date, timezone, _backend.name)
+        ret_date = caches['datetime'].get(key)
+        if ret_date is None:
+            ret_date = __to_datetime_by_pattern(date, date_patterns, timezone)
+            if not ret_date:
+                raise exception.DatePatternException(date, date_patterns)
+            caches['datetime'].set(key, ret_date)
     # 日期时间
     elif isinstance(date, datetime.datetime):
-        ret_date = pendulum.from_timestamp(
+        ret_date = _backend.from_timestamp(
             date.timestamp(),
             tz=timezone
         )
         pass
     # 日期
     elif isinstance(date, datetime.date):
-        ret_date = pendulum.datetime(
+        ret_date = _backend.datetime(
             year=date.year,
             month=date.month,
             day=date.day,
@@ -194,13 +687,13 @@ def to_time(
         to_time(date='01:02:03', timezone=None)
     '''
     if isinstance(date, datetime.time):
-        time = pendulum.time(
+        time = _backend.time(
             hour=date.hour,
             minute=date.minute,
             second=date.second
         )
-    elif isinstance(date, str) and re.match(time_patterns[0][1], date):
-        time = pendulum.from_format(
+    elif isinstance(date, str) and _compile_pattern(time_patterns[0][1]).match(date):
+        time = _backend.from_format(
             date, time_patterns[0][0], tz=timezone
         ).time()
     elif isinstance(date, int) or isinstance(date, float) or isinstance(date, str) or isinstance(date, datetime.date):
@@ -210,36 +703,167 @@ def to_time(
     return time
 
 
+# 日期序列，按需计算元素，支持len、索引、切片与迭代
+class DateRange():
+    chunk_size = 10000  # 迭代时每次计算的元素数量
+
+    def __init__(
+            self,
+            start: Union[int, float, str, datetime.date],
+            end: Union[int, float, str, datetime.date],
+            step: str = '1d',
+            timezone: str = None,
+            fmt: str = '%Y-%m-%d',
+            dtype: str = None,
+    ):
+        '''
+        :param start: 起始日期时间 (包含起始)
+        :param end: 终止日期时间 （包含终止）
+        :param step: 间隔，格式同K线周期，例如：'1m','4h','1d','1w','1M'
+            分钟、小时：从起始时间戳开始按照固定毫秒数递增
+            日、周、月：从起始日期开始按照日历递增，夏令时当天与tomorrow()相同
+        :param timezone: 时区 None使用本地默认时区
+        :param fmt: 元素的字符串格式 None表示不格式化，返回日期对象
+        :param dtype: 元素类型
+            None:           按照fmt格式化
+            'int64':        毫秒时间戳
+            'datetime64':   np.datetime64[ms]，UTC时间
+        '''
+        from paux.bar import get_bar
+        if dtype not in [None, 'int64', 'datetime64']:
+            raise exception.ParamException('dtype must in [None, "int64", "datetime64"]')
+        bar = get_bar(step)
+        self.step = step
+        self.timezone = timezone
+        self.fmt = fmt
+        self.dtype = dtype
+        self._unit = bar.unit.lower() if bar.unit != 'M' else 'M'
+        self._number = bar.number
+        self._step = bar.step
+        self._pd_timezone = _to_pd_timezone(timezone)
+        start_ts = to_ts(start, timezone)
+        end_ts = to_ts(end, timezone)
+        if self._unit in 'mh':
+            self._start = start_ts
+            count = (end_ts - start_ts) // self._step + 1
+        else:
+            bounds = np.array([start_ts, end_ts], dtype=np.int64)
+            start_day, end_day = (bounds + _get_utc_offsets(bounds, self._pd_timezone)) // 86400000
+            if self._unit == 'M':
+                start_date = np.datetime64(int(start_day), 'D')
+                self._start = int(start_date.astype('datetime64[M]').astype(np.int64))
+                self._start_day = int((start_date - start_date.astype('datetime64[M]')).astype(np.int64)) + 1
+                end_month = int(np.datetime64(int(end_day), 'D').astype('datetime64[M]').astype(np.int64))
+                count = (end_month - self._start) // self._number + 1
+                if count > 0 and self._get_walls(np.array([count - 1]))[0] // 86400000 > end_day:
+                    count -= 1
+            else:
+                self._start = int(start_day) * 86400000
+                count = (int(end_day) * 86400000 - self._start) // self._step + 1
+        self._indices = range(max(count, 0))
+
+    # 日、周、月的本地时间（按UTC计算的毫秒数）
+    def _get_walls(self, indices: np.ndarray) -> np.ndarray:
+        if self._unit != 'M':
+            return self._start + indices * self._step
+        months = self._start + indices * self._number
+        first_day = months.astype('datetime64[M]').astype('datetime64[D]')
+        month_days = ((months + 1).astype('datetime64[M]').astype('datetime64[D]') - first_day).astype(np.int64)
+        days = np.minimum(self._start_day, month_days) - 1
+        return first_day.astype('datetime64[ms]').astype(np.int64) + days * 86400000
+
+    # 索引对应的毫秒时间戳
+    def _get_ts(self, indices) -> np.ndarray:
+        indices = np.asarray(indices, dtype=np.int64)
+        if self._unit in 'mh':
+            return self._start + indices * self._step
+        return _wall_to_ts(self._get_walls(indices), self._pd_timezone)
+
+    # 将毫秒时间戳转化为元素
+    def _convert(self, ts: np.ndarray):
+        if self.dtype == 'int64':
+            return ts
+        if self.dtype == 'datetime64':
+            return ts.astype('datetime64[ms]')
+        if self.fmt:
+            return to_fmt_array(ts, self.timezone, self.fmt)
+        dates = [to_datetime(int(t), self.timezone) for t in ts]
+        if self._unit in 'mh':
+            return dates
+        return [date.date() for date in dates]
+
+    def __len__(self):
+        return len(self._indices)
+
+    def __getitem__(self, item):
+        if isinstance(item, slice):
+            date_range = copy.copy(self)
+            date_range._indices = self._indices[item]
+            return date_range
+        ts = self._get_ts([self._indices[item]])
+        value = self._convert(ts)[0]
+        return int(value) if self.dtype == 'int64' else value
+
+    def __iter__(self):
+        for i in range(0, len(self._indices), self.chunk_size):
+            yield from self._convert(self._get_ts(self._indices[i:i + self.chunk_size]))
+
+    def __array__(self, dtype=None, copy=None):
+        array = np.asarray(self.to_numpy())
+        return array.astype(dtype) if dtype is not None else array
+
+    def __repr__(self):
+        return 'DateRange(step={step}, len={len})'.format(step=repr(self.step), len=len(self))
+
+    # 转化为数组
+    def to_numpy(self) -> np.ndarray:
+        values = self._convert(self._get_ts(self._indices))
+        if isinstance(values, list):
+            array = np.empty(len(values), dtype=object)
+            array[:] = values
+            return array
+        return values
+
+    # 转化为列表
+    def to_list(self) -> list:
+        if self.dtype is None:
+            return list(self)
+        return self._convert(self._get_ts(self._indices)).tolist()
+
+
 # 得到日期序列
 def get_range_dates(
         start: Union[int, float, str, datetime.date],
         end: Union[int, float, str, datetime.date],
         timezone: str = None,
-        fmt='%Y-%m-%d'
+        fmt='%Y-%m-%d',
+        step: str = '1d',
+        mode: str = 'list',
 ):
     '''
     :param start: 起始日期时间 (包含起始)
     :param end: 终止日期时间 （包含终止）
     :param timezone: 时区 None使用本地默认时区
     :param fmt: 日期序列的字符串格式 None表示不格式化，返回日期对象
+    :param step: 间隔，例如：'1m','4h','1d'，详见DateRange
+    :param mode: 返回方式
+        'list':         列表
+        'iter':         DateRange，按需生成元素，支持len与切片
+        'int64':        DateRange，元素为毫秒时间戳，np.asarray得到数组
+        'datetime64':   DateRange，元素为np.datetime64[ms]，np.asarray得到数组
     :return:
         [date,date,date....]
         [str,str,str,....]
+        DateRange
     '''
-    start_datetime = to_datetime(date=start, timezone=timezone)
-    end_datetime = to_datetime(date=end, timezone=timezone)
-
-    start_date = start_datetime.date()
-    end_date = end_datetime.date()
-    if fmt:
-        dates: list = [
-            (start_date + datetime.timedelta(days=day)).strftime('%Y-%m-%d')
-            for day in range((end_date - start_date).days + 1)
-        ]
-    else:
-        dates: list = [day for day in range((end_date - start_date).days + 1)]
-
-    return dates
+    if mode not in ['list', 'iter', 'int64', 'datetime64']:
+        raise exception.ParamException('mode must in ["list","iter","int64","datetime64"]')
+    if mode in ['int64', 'datetime64']:
+        return DateRange(start=start, end=end, step=step, timezone=timezone, fmt=fmt, dtype=mode)
+    date_range = DateRange(start=start, end=end, step=step, timezone=timezone, fmt=fmt)
+    if mode == 'iter':
+        return date_range
+    return date_range.to_list()
 
 
 # 格式化为字符串
@@ -256,6 +880,199 @@ def to_fmt(
     return to_datetime(date, timezone).strftime(fmt)
 
 
+# 只与日期、UTC偏移有关的格式符
+_fmt_day_directives = set('aAwdbBmyYjUWuVGCeDFghxzZnt%')
+# 只与当天时间有关的格式符
+_fmt_time_directives = set('HIMSfp')
+_fmt_two_digits = np.array(['%02d' % i for i in range(100)])
+_fmt_microseconds = np.array(['%03d000' % i for i in range(1000)])
+
+
+# 将格式拆分为[(is_time, text), ...]，存在不支持的格式符返回None
+def _split_fmt(fmt: str):
+    segments = []
+    text = ''
+    for token in re.findall('%.?|[^%]+', fmt, flags=re.S):
+        if not token.startswith('%'):
+            text += token
+        elif len(token) == 2 and token[1] in _fmt_time_directives:
+            if text:
+                segments.append((False, text))
+                text = ''
+            segments.append((True, token))
+        elif len(token) == 2 and token[1] in _fmt_day_directives:
+            text += token
+        else:
+            return None
+    if text:
+        segments.append((False, text))
+    return segments
+
+
+# 批量格式化为字符串
+def to_fmt_array(
+        dates,
+        timezone: str = None,
+        fmt='%Y-%m-%d %H:%M:%S'
+) -> np.ndarray:
+    '''
+    :param dates: 毫秒时间戳序列 list|np.ndarray|pd.Series
+    :param timezone: 时区 None使用本地默认时区
+    :param fmt: 格式
+    :return: np.ndarray[str] 与逐个调用to_fmt的结果相同
+    例如：
+        to_fmt_array(dates=[1641092645000, 1641096245000], timezone='America/New_York', fmt='%Y-%m-%d %H:%M:%S')
+    '''
+    values = np.asarray(dates)
+    if values.dtype.kind not in 'biuf':
+        raise exception.ParamException('dates must be millisecond timestamps')
+    if values.dtype.kind == 'f' and np.isnan(values).any():
+        raise exception.ParamException('dates must not contain NaN')
+    ts = values.astype(np.int64)
+    if len(ts) == 0:
+        return np.array([], dtype=object)
+    segments = _split_fmt(fmt)
+    # 存在不支持的格式符，对不重复的时间戳逐个格式化
+    if segments is None:
+        unique_ts, inverse = np.unique(ts, return_inverse=True)
+        texts = np.array([to_fmt(int(t), timezone, fmt) for t in unique_ts], dtype=object)
+        return texts[inverse]
+    offsets = _get_utc_offsets(ts, timezone)
+    wall = ts + offsets
+    day_ms = wall % 86400000
+    # 同一天、同一UTC偏移的日期部分只格式化一次
+    keys = (wall // 86400000) * (1 << 28) + offsets // 1000
+    unique_keys, first_index, inverse = np.unique(keys, return_index=True, return_inverse=True)
+    day_datetimes = [to_datetime(int(ts[i]), timezone) for i in first_index]
+    hour = day_ms // 3600000
+    result = np.full(len(ts), '', dtype='U1')
+    for is_time, text in segments:
+        if not is_time:
+            texts = np.array([d.strftime(text) for d in day_datetimes])[inverse]
+        elif text == '%H':
+            texts = _fmt_two_digits[hour]
+        elif text == '%I':
+            texts = _fmt_two_digits[(hour + 11) % 12 + 1]
+        elif text == '%M':
+            texts = _fmt_two_digits[day_ms // 60000 % 60]
+        elif text == '%S':
+            texts = _fmt_two_digits[day_ms // 1000 % 60]
+        elif text == '%f':
+            texts = _fmt_microseconds[day_ms % 1000]
+        else:
+            texts = np.where(hour < 12, datetime.time(0).strftime('%p'), datetime.time(12).strftime('%p'))
+        result = np.char.add(result, texts)
+    return result.astype(object)
+
+
+# 时间段集合，预先将时间段转化为按起点排序的当日秒数区间
+class PeriodSet():
+    def __init__(self, periods: list):
+        '''
+        :param periods: 允许的时间段 列表嵌套多个时间段，包含起点与终点
+            例如：[
+                ['00:00:00','01:00:00'],
+                ['02:00:00','03:00:00']
+            ]
+        '''
+        intervals = []
+        for period in periods or []:
+            start, end = self._to_seconds(period[0]), self._to_seconds(period[1])
+            # 起点大于终点的时间段不包含任何时间
+            if start <= end:
+                intervals.append([start, end])
+        intervals.sort()
+        merged = []
+        for start, end in intervals:
+            if merged and start <= merged[-1][1] + 1:
+                merged[-1][1] = max(merged[-1][1], end)
+            else:
+                merged.append([start, end])
+        self.starts = np.array([start for start, end in merged], dtype=np.int64)
+        self.ends = np.array([end for start, end in merged], dtype=np.int64)
+        self._starts = self.starts.tolist()
+        self._ends = self.ends.tolist()
+
+    # 'HH:mm:ss'或时间对象转化为当日秒数
+    @staticmethod
+    def _to_seconds(time) -> int:
+        if isinstance(time, datetime.time):
+            return time.hour * 3600 + time.minute * 60 + time.second
+        if isinstance(time, str) and _compile_pattern(time_patterns[0][1]).match(time):
+            hour, minute, second = time.split(':')
+            return int(hour) * 3600 + int(minute) * 60 + int(second)
+        msg = "period must like ['HH:mm:ss','HH:mm:ss'], period time = {time}".format(time=str(time))
+        raise exception.ParamException(msg)
+
+    def __len__(self):
+        return len(self._starts)
+
+    # 当日秒数是否在时间段中
+    def contains(self, seconds: int) -> bool:
+        index = bisect.bisect_right(self._starts, seconds) - 1
+        return index >= 0 and seconds <= self._ends[index]
+
+    # 是否在时间段中
+    def is_allowed(
+            self,
+            date: Union[int, float, str, datetime.date, datetime.time],
+            timezone: str = None
+    ) -> bool:
+        '''
+        :param date: 日期
+        :param timezone: 时区
+        :return: True|False
+        '''
+        if not self._starts:
+            return False
+        # 毫秒时间戳直接计算当地时间，与to_time相同
+        if isinstance(date, (int, float)):
+            tz = _backend.get_timezone(timezone)
+            if tz is None:
+                time = datetime.datetime.fromtimestamp(int(date) / 1000)
+            else:
+                time = datetime.datetime.fromtimestamp(int(date) / 1000, tz=tz)
+        else:
+            time = to_time(date, timezone)
+        return self.contains(time.hour * 3600 + time.minute * 60 + time.second)
+
+    # 批量判断是否在时间段中
+    def get_mask(
+            self,
+            dates,
+            timezone: str = None
+    ) -> np.ndarray:
+        '''
+        :param dates: 毫秒时间戳序列，其他类型的序列逐个使用is_allowed判断
+        :param timezone: 时区
+        :return: np.ndarray[bool]
+        '''
+        values = np.asarray(dates)
+        if values.dtype.kind not in 'iuf':
+            return np.fromiter((self.is_allowed(date, timezone) for date in values), dtype=bool, count=len(values))
+        if not self._starts or len(values) == 0:
+            return np.zeros(len(values), dtype=bool)
+        ts = values.astype(np.int64)
+        seconds = (ts + _get_utc_offsets(ts, timezone)) // 1000 % 86400
+        index = np.searchsorted(self.starts, seconds, side='right') - 1
+        return (index >= 0) & (seconds <= self.ends[np.maximum(index, 0)])
+
+
+# 获取时间段集合，相同的periods只转化一次
+def get_period_set(periods: list) -> PeriodSet:
+    '''
+    :param periods: 允许的时间段 列表嵌套多个时间段
+    '''
+    if isinstance(periods, PeriodSet):
+        return periods
+    key = tuple(tuple(period) for period in periods or [])
+    period_set = caches['period'].get(key)
+    if period_set is None:
+        period_set = PeriodSet(periods)
+        caches['period'].set(key, period_set)
+    return period_set
+
+
 # 是否在时间段中
 def is_period_allowed(
         date: Union[int, float, str, datetime.date, datetime.time],
@@ -264,7 +1081,7 @@ def is_period_allowed(
 ):
     '''
     :param date: 日期
-    :param periods: 允许的时间段 列表嵌套多个时间段
+    :param periods: 允许的时间段 列表嵌套多个时间段，也可以是PeriodSet
         例如：[
             ['00:00:00','01:00:00'],
             ['02:00:00','03:00:00']
@@ -275,11 +1092,97 @@ def is_period_allowed(
     '''
     if not periods:
         return False
-    time = to_time(date, timezone).strftime('%H:%M:%S')
-    for period in periods:
-        if time >= period[0] and time <= period[1]:
-            return True
-    return False
+    return get_period_set(periods).is_allowed(date, timezone)
+
+
+# 日历表，按时区预先计算每天零点的时间戳，按年份懒加载
+class CalendarTable():
+    def __init__(self, timezone: str = None):
+        '''
+        :param timezone: 时区 None使用本地默认时区
+        '''
+        self.timezone = timezone
+        self._pd_timezone = _to_pd_timezone(timezone)
+        # (第一天距1970-01-01的天数, 每天零点的时间戳，比天数多一个)
+        self._table = (0, np.zeros(1, dtype=np.int64))
+
+    # 保证日历表覆盖[first_day, last_day]所在的全部年份
+    def _extend(self, first_day: int, last_day: int):
+        table_first_day, midnights = self._table
+        table_last_day = table_first_day + len(midnights) - 2
+        if len(midnights) > 1 and table_first_day <= first_day and last_day <= table_last_day:
+            return
+        if len(midnights) > 1:
+            first_day = min(first_day, table_first_day)
+            last_day = max(last_day, table_last_day)
+        first_year = np.datetime64(first_day, 'D').astype('datetime64[Y]')
+        last_year = np.datetime64(last_day, 'D').astype('datetime64[Y]')
+        start = int(first_year.astype('datetime64[D]').astype(np.int64))
+        end = int((last_year + 1).astype('datetime64[D]').astype(np.int64))
+        days = np.arange(start, end + 1, dtype=np.int64)
+        self._table = (start, _wall_to_ts(days * 86400000, self._pd_timezone))
+
+    # 本地日期（距1970-01-01的天数）对应的零点与下一天零点的时间戳
+    def _lookup(self, days: np.ndarray):
+        days = np.asarray(days, dtype=np.int64)
+        if len(days):
+            self._extend(int(days.min()), int(days.max()))
+        first_day, midnights = self._table
+        index = days - first_day
+        return midnights[index], midnights[index + 1]
+
+    # 毫秒时间戳的本地日期（距1970-01-01的天数）与本地时间（按UTC计算的毫秒数）
+    def _get_days(self, ts: np.ndarray):
+        wall = ts + _get_utc_offsets(ts, self._pd_timezone)
+        return wall // 86400000, wall
+
+    # 一个月有多少天
+    def get_month_days(self, year: int, month: int) -> int:
+        return int(self.get_month_days_array([year], [month])[0])
+
+    # 批量计算一个月有多少天
+    def get_month_days_array(self, years, months) -> np.ndarray:
+        months = np.asarray(years, dtype=np.int64) * 12 + np.asarray(months, dtype=np.int64) - 1 - 1970 * 12
+        first_days = months.astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+        last_days = (months + 1).astype('datetime64[M]').astype('datetime64[D]').astype(np.int64)
+        if len(first_days):
+            self._extend(int(first_days.min()), int(last_days.max()))
+        return last_days - first_days
+
+    # 批量计算所在本地日期的长度（毫秒），夏令时当天为23或25小时
+    def get_day_ms_array(self, ts) -> np.ndarray:
+        days, wall = self._get_days(np.asarray(ts, dtype=np.int64))
+        start, end = self._lookup(days)
+        return end - start
+
+    # 批量计算所在本地日期的零点时间戳
+    def get_day_start_array(self, ts) -> np.ndarray:
+        days, wall = self._get_days(np.asarray(ts, dtype=np.int64))
+        return self._lookup(days)[0]
+
+    # 批量计算明天相同本地时间的时间戳，与to_ts(tomorrow(date))相同
+    def get_tomorrow_ts_array(self, ts) -> np.ndarray:
+        days, wall = self._get_days(np.asarray(ts, dtype=np.int64))
+        next_start, next_end = self._lookup(days + 1)
+        seconds_ms = wall % 86400000 // 1000 * 1000
+        result = next_start + seconds_ms
+        # 明天有夏令时切换，按照本地时间重新计算
+        irregular = (next_end - next_start) != 86400000
+        if irregular.any():
+            result[irregular] = _wall_to_ts((days[irregular] + 1) * 86400000 + seconds_ms[irregular], self.timezone)
+        return result
+
+
+# 获取时区的日历表
+def get_calendar(timezone: str = None) -> CalendarTable:
+    '''
+    :param timezone: 时区 None使用本地默认时区
+    '''
+    calendar = caches['calendar'].get(timezone)
+    if calendar is None:
+        calendar = CalendarTable(timezone)
+        caches['calendar'].set(timezone, calendar)
+    return calendar
 
 
 # 计算一个月有多少天
@@ -288,22 +1191,69 @@ def get_month_days(
         month: Union[str, int],
         timezone: str = None
 ):
-    year = int(year)
-    month = int(month)
-    start_date = to_datetime(
-        date='{:04d}-{:02d}-{:02d}'.format(year, month, 1),
-        timezone=timezone,
-    )
-    if month == 12:
-        month = 1
-        year = year + 1
-    else:
-        month = month + 1
-    end_date = to_datetime(
-        date='{:04d}-{:02d}-{:02d}'.format(year, month, 1),
-        timezone=timezone,
-    )
-    return (end_date - start_date).days
+    '''
+    :param year: 年
+    :param month: 月
+    :param timezone: 时区
+    :return: 本地日历的天数
+    '''
+    return get_calendar(timezone).get_month_days(int(year), int(month))
+
+
+# 批量计算一个月有多少天
+def get_month_days_array(years, months, timezone: str = None) -> np.ndarray:
+    '''
+    :param years: 年序列
+    :param months: 月序列
+    :param timezone: 时区
+    :return: np.ndarray[int64]
+    '''
+    return get_calendar(timezone).get_month_days_array(years, months)
+
+
+# 计算所在本地日期的长度（毫秒）
+def get_day_ms(
+        date: Union[int, float, str, datetime.date],
+        timezone: str = None
+) -> int:
+    '''
+    :param date: 日期
+    :param timezone: 时区
+    :return: 86400000，夏令时当天为82800000或90000000
+    '''
+    return int(get_calendar(timezone).get_day_ms_array([to_ts(date, timezone)])[0])
+
+
+# 批量计算所在本地日期的长度（毫秒）
+def get_day_ms_array(dates, timezone: str = None) -> np.ndarray:
+    '''
+    :param dates: 日期序列，元素类型同to_ts_array
+    :param timezone: 时区
+    :return: np.ndarray[int64]
+    '''
+    return get_calendar(timezone).get_day_ms_array(to_ts_array(dates, timezone))
+
+
+# 计算明天相同本地时间的毫秒时间戳，与to_ts(tomorrow(date))相同
+def get_tomorrow_ts(
+        date: Union[int, float, str, datetime.date],
+        timezone: str = None
+) -> int:
+    '''
+    :param date: 日期
+    :param timezone: 时区
+    '''
+    return int(get_calendar(timezone).get_tomorrow_ts_array([to_ts(date, timezone)])[0])
+
+
+# 批量计算明天相同本地时间的毫秒时间戳
+def get_tomorrow_ts_array(dates, timezone: str = None) -> np.ndarray:
+    '''
+    :param dates: 日期序列，元素类型同to_ts_array
+    :param timezone: 时区
+    :return: np.ndarray[int64]
+    '''
+    return get_calendar(timezone).get_tomorrow_ts_array(to_ts_array(dates, timezone))
 
 
 if __name__ == '__main__':
@@ -1,4 +1,9 @@
 import os
+import json
+import itertools
+import contextlib
+import pandas as pd
+from paux import date as _date
 from paux.exception import ParamException
 
 
@@ -69,6 +74,150 @@ def get_deep_filepaths(dirpath, suffix=''):
     return result_filepaths
 
 
+# 写入同目录下的临时文件，成功后替换为目标文件，失败时删除临时文件，不留下不完整的目标文件
+@contextlib.contextmanager
+def _open_atomic(dst: str, encoding: str = 'utf-8', newline: str = None):
+    tmp_path = '{dst}.{pid}.tmp'.format(dst=dst, pid=os.getpid())
+    try:
+        with open(tmp_path, 'w', encoding=encoding, newline=newline) as f:
+            yield f
+        os.replace(tmp_path, dst)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+# CSV中的日期列（字符串）转化为毫秒时间戳，数字字符串按照毫秒时间戳处理，与分块方式无关
+def _csv_column_to_ts(series: pd.Series, timezone: str = None, default: int = 0):
+    values = series.to_numpy(dtype=object)
+    numbers = pd.to_numeric(series, errors='coerce').to_numpy()
+    is_number = ~pd.isna(numbers)
+    values[is_number] = numbers[is_number]
+    return _date.to_ts_array(values, timezone=timezone, default=default)
+
+
+# 流式转换CSV文件中的日期列为毫秒时间戳，内存占用只与chunk_size有关
+def normalize_ts_csv(
+        src: str,
+        dst: str,
+        columns: list,
+        timezone: str = None,
+        default: int = 0,
+        chunk_size: int = 100000,
+        encoding: str = 'utf-8',
+        sep: str = ',',
+) -> int:
+    '''
+    :param src: 输入文件路径
+    :param dst: 输出文件路径
+    :param columns: 需要转换的日期列
+    :param timezone: 时区
+    :param default: 空值的默认值
+    :param chunk_size: 每次读取的行数
+    :param encoding: 文件编码
+    :param sep: 分隔符
+    :return: 转换的行数
+    转换规则同paux.date.to_ts，数字按照毫秒时间戳处理，字符串按照date_patterns识别，无法识别时抛出DatePatternException
+    全部列按照字符串读取，结果与chunk_size无关，其他列按照原始字符串写出
+    转换成功后才写入dst，失败时dst保持不变
+    '''
+    columns = list(columns)
+    header = pd.read_csv(src, sep=sep, encoding=encoding, nrows=0).columns
+    missing_columns = [column for column in columns if column not in header]
+    if missing_columns:
+        raise ParamException('columns not found: {columns}'.format(columns=missing_columns))
+    reader = pd.read_csv(
+        src,
+        sep=sep,
+        encoding=encoding,
+        chunksize=chunk_size,
+        dtype=str,
+        keep_default_na=False,
+        na_values={column: [''] for column in columns},
+    )
+    num = 0
+    with _open_atomic(dst, encoding=encoding, newline='') as f:
+        for i, chunk in enumerate(reader):
+            for column in columns:
+                chunk[column] = _csv_column_to_ts(chunk[column], timezone=timezone, default=default)
+            chunk.to_csv(f, sep=sep, index=False, header=(i == 0))
+            num += len(chunk)
+        # 只有表头的文件
+        if num == 0 and f.tell() == 0:
+            f.write(sep.join(header) + '\n')
+    return num
+
+
+# 流式转换JSONL文件中的日期字段为毫秒时间戳，内存占用只与chunk_size有关
+def normalize_ts_jsonl(
+        src: str,
+        dst: str,
+        columns: list,
+        timezone: str = None,
+        default: int = 0,
+        chunk_size: int = 100000,
+        encoding: str = 'utf-8',
+) -> int:
+    '''
+    :param src: 输入文件路径
+    :param dst: 输出文件路径
+    :param columns: 需要转换的日期字段，缺失的字段按照默认值写出
+    :param timezone: 时区
+    :param default: 空值的默认值
+    :param chunk_size: 每次读取的行数
+    :param encoding: 文件编码
+    :return: 转换的行数
+    转换规则同paux.date.to_ts，其他字段原样写出，空行跳过
+    转换成功后才写入dst，失败时dst保持不变
+    '''
+    num = 0
+    with open(src, 'r', encoding=encoding) as f_src, _open_atomic(dst, encoding=encoding) as f_dst:
+        lines = (line for line in f_src if line.strip())
+        while True:
+            records = [json.loads(line) for line in itertools.islice(lines, chunk_size)]
+            if not records:
+                break
+            for column in columns:
+                ts = _date.to_ts_array([record.get(column) for record in records], timezone=timezone,
+                                       default=default)
+                for record, value in zip(records, ts.tolist()):
+                    record[column] = value
+            f_dst.write(''.join(json.dumps(record, ensure_ascii=False) + '\n' for record in records))
+            num += len(records)
+    return num
+
+
+# 流式转换文件中的日期列为毫秒时间戳，根据后缀选择CSV或JSONL
+def normalize_ts_file(
+        src: str,
+        dst: str,
+        columns: list,
+        timezone: str = None,
+        default: int = 0,
+        chunk_size: int = 100000,
+        encoding: str = 'utf-8',
+) -> int:
+    '''
+    :param src: 输入文件路径，后缀为.csv或.jsonl
+    :param dst: 输出文件路径
+    :param columns: 需要转换的日期列
+    :param timezone: 时区
+    :param default: 空值的默认值
+    :param chunk_size: 每次读取的行数
+    :param encoding: 文件编码
+    :return: 转换的行数
+    例如：
+        normalize_ts_file(src='trades.csv', dst='trades_ts.csv', columns=['date'], timezone='America/New_York')
+    '''
+    suffix = os.path.splitext(src)[1].lower()
+    if suffix == '.csv':
+        return normalize_ts_csv(src, dst, columns, timezone, default, chunk_size, encoding)
+    elif suffix in ['.jsonl', '.ndjson']:
+        return normalize_ts_jsonl(src, dst, columns, timezone, default, chunk_size, encoding)
+    raise ParamException('src suffix must in [".csv",".jsonl",".ndjson"]')
+
+
 if __name__ == '__main__':
     pass
     # print(list_dirpath('../dist', type='file', suffix='.whl'))
@@ -0,0 +1,221 @@
+from typing import Literal, Union
+from paux import exception
+
+# 浮点数量的比较容差，相对持仓数量，持仓数量小于1时按1计算
+_QUANTITY_TOLERANCE = 1e-9
+
+
+# 单个持仓，只保存累计值，内存与成交数量无关
+class Position():
+    __slots__ = ('symbol', 'posSide', 'quantity', 'avgPrice', 'realizedPnl', 'commission', 'markPrice')
+
+    def __init__(self, symbol: str, posSide: str):
+        self.symbol = symbol
+        self.posSide = posSide
+        self.quantity = 0  # 持仓数量
+        self.avgPrice = 0  # 开仓均价
+        self.realizedPnl = 0  # 已实现盈亏，不含手续费
+        self.commission = 0  # 累计手续费
+        self.markPrice = None  # 最新标记价格
+
+    # 未实现盈亏
+    @property
+    def unrealizedPnl(self) -> float:
+        if self.markPrice is None or self.quantity == 0:
+            return 0
+        if self.posSide == 'LONG':
+            return (self.markPrice - self.avgPrice) * self.quantity
+        return (self.avgPrice - self.markPrice) * self.quantity
+
+    def to_dict(self) -> dict:
+        return dict(
+            symbol=self.symbol,
+            posSide=self.posSide,
+            quantity=self.quantity,
+            avgPrice=self.avgPrice,
+            markPrice=self.markPrice,
+            realizedPnl=self.realizedPnl,
+            unrealizedPnl=self.unrealizedPnl,
+            commission=self.commission,
+        )
+
+
+# 根据成交流增量计算持仓与盈亏
+class Ledger():
+    '''
+    手续费公式同paux.order.get_commission_data：
+        开仓手续费 = 开仓价格 * 数量 * 开仓手续费率
+        LONG平仓手续费 = 平仓价格 * 数量 * 平仓手续费率
+        SHORT平仓手续费 = (2 * 开仓均价 - 平仓价格) * 数量 * 平仓手续费率
+    例如：
+        ledger = Ledger()
+        ledger.add_fill(symbol='BTCUSDT', posSide='LONG', action='OPEN', price=100, quantity=1, commissionRate=0.0004)
+        ledger.add_fill(symbol='BTCUSDT', posSide='LONG', action='CLOSE', price=110, quantity=0.5,
+                        commissionRate=0.0004)
+        ledger.mark(symbol='BTCUSDT', price=105)
+        ledger.get_summary()
+    '''
+
+    def __init__(self):
+        self.positions = {}  # (symbol, posSide) -> Position
+
+    # 获取持仓，不存在时create为True则创建，否则返回None
+    def _get_position(self, symbol: str, posSide: str, create: bool = False) -> Position:
+        posSide = posSide.upper()
+        if posSide not in ['LONG', 'SHORT']:
+            raise exception.PosSideException(posSide)
+        key = (symbol, posSide)
+        position = self.positions.get(key)
+        if position is None and create:
+            position = Position(symbol, posSide)
+            self.positions[key] = position
+        return position
+
+    # 处理一笔成交
+    def add_fill(
+            self,
+            symbol: str,
+            posSide: Literal['long', 'short', 'LONG', 'SHORT'],
+            action: Literal['open', 'close', 'OPEN', 'CLOSE'],
+            price: Union[int, float],
+            quantity: Union[int, float],
+            commissionRate: Union[int, float] = 0
+    ) -> dict:
+        '''
+        :param symbol: 交易对
+        :param posSide: 持仓方向
+            LONG:   多单
+            SHORT:  空单
+        :param action: 开平方向
+            OPEN:   开仓
+            CLOSE:  平仓
+        :param price: 成交价格
+        :param quantity: 成交数量
+        :param commissionRate: 手续费率
+        :return:
+            {
+                'commission' : <本次成交的手续费>,
+                'realizedPnl' : <本次成交的已实现盈亏，不含手续费>,
+            }
+        '''
+        # 参数检查通过后才创建持仓，避免异常时留下空的持仓
+        action = action.upper()
+        if action not in ['OPEN', 'CLOSE']:
+            msg = 'action must in ["OPEN","CLOSE"]'
+            raise exception.ParamException(msg)
+        if not quantity > 0:
+            raise exception.ParamException(f'quantity must > 0, quantity={quantity}')
+        position = self._get_position(symbol, posSide, create=(action == 'OPEN'))
+        if position is None:
+            msg = f'close quantity={quantity} > position quantity=0 symbol={symbol}'
+            raise exception.ExecuteException(msg)
+        if action == 'OPEN':
+            commission = price * quantity * commissionRate
+            realizedPnl = 0
+            total = position.quantity + quantity
+            position.avgPrice = (position.avgPrice * position.quantity + price * quantity) / total
+            position.quantity = total
+        else:
+            # 浮点累加误差范围内的超出视为全部平仓，例如开仓0.3后分别平仓0.1和0.2
+            tolerance = _QUANTITY_TOLERANCE * max(1, position.quantity)
+            if quantity > position.quantity + tolerance:
+                msg = f'close quantity={quantity} > position quantity={position.quantity} symbol={symbol}'
+                raise exception.ExecuteException(msg)
+            quantity = min(quantity, position.quantity)
+            if position.posSide == 'LONG':
+                commission = price * quantity * commissionRate
+                realizedPnl = (price - position.avgPrice) * quantity
+            else:
+                commission = (2 * position.avgPrice - price) * quantity * commissionRate
+                realizedPnl = (position.avgPrice - price) * quantity
+            position.quantity -= quantity
+            # 剩余的浮点残量归零，避免残留持仓保留旧的开仓均价
+            if position.quantity <= tolerance:
+                position.quantity = 0
+                position.avgPrice = 0
+        position.commission += commission
+        position.realizedPnl += realizedPnl
+        position.markPrice = price
+        return dict(
+            commission=commission,
+            realizedPnl=realizedPnl,
+        )
+
+    # 批量处理成交
+    def add_fills(self, fills) -> int:
+        '''
+        :param fills: 成交序列，元素为add_fill参数的字典，可以是生成器
+        :return: 处理的成交数量
+        '''
+        num = 0
+        for fill in fills:
+            self.add_fill(**fill)
+            num += 1
+        return num
+
+    # 更新标记价格，用于计算未实现盈亏
+    def mark(self, symbol: str, price: Union[int, float]):
+        '''
+        :param symbol: 交易对
+        :param price: 标记价格
+        '''
+        for posSide in ['LONG', 'SHORT']:
+            position = self.positions.get((symbol, posSide))
+            if position is not None:
+                position.markPrice = price
+
+    # 获取持仓
+    def get_position(self, symbol: str, posSide: Literal['long', 'short', 'LONG', 'SHORT']) -> dict:
+        '''
+        :param symbol: 交易对
+        :param posSide: 持仓方向
+        :return:
+            {
+                'symbol' : <str>,
+                'posSide' : <str>,
+                'quantity' : <持仓数量>,
+                'avgPrice' : <开仓均价>,
+                'markPrice' : <标记价格>,
+                'realizedPnl' : <已实现盈亏>,
+                'unrealizedPnl' : <未实现盈亏>,
+                'commission' : <累计手续费>,
+            }
+        '''
+        position = self._get_position(symbol, posSide)
+        # 不存在的持仓返回空持仓，不加入positions
+        if position is None:
+            position = Position(symbol, posSide.upper())
+        return position.to_dict()
+
+    # 获取全部持仓
+    def get_positions(self) -> list:
+        return [position.to_dict() for position in self.positions.values()]
+
+    # 汇总盈亏
+    def get_summary(self) -> dict:
+        '''
+        :return:
+            {
+                'realizedPnl' : <已实现盈亏>,
+                'unrealizedPnl' : <未实现盈亏>,
+                'commission' : <累计手续费>,
+                'netPnl' : <已实现盈亏 + 未实现盈亏 - 手续费>,
+            }
+        '''
+        realizedPnl = sum(position.realizedPnl for position in self.positions.values())
+        unrealizedPnl = sum(position.unrealizedPnl for position in self.positions.values())
+        commission = sum(position.commission for position in self.positions.values())
+        return dict(
+            realizedPnl=realizedPnl,
+            unrealizedPnl=unrealizedPnl,
+            commission=commission,
+            netPnl=realizedPnl + unrealizedPnl - commission,
+        )
+
+
+if __name__ == '__main__':
+    pass
+    # ledger = Ledger()
+    # ledger.add_fill(symbol='BTCUSDT', posSide='SHORT', action='OPEN', price=50, quantity=1, commissionRate=0.0004)
+    # ledger.add_fill(symbol='BTCUSDT', posSide='SHORT', action='CLOSE', price=45, quantity=1, commissionRate=0.0004)
+    # print(ledger.get_summary())
@@ -1,5 +1,8 @@
 from typing import Literal, Union
 from paux import exception
+from paux.cache import Cache
+from decimal import Decimal, InvalidOperation
+import numpy as np
 import re
 
 
@@ -54,6 +57,101 @@ def get_commission_data(
         )
 
 
+# 与内置round相同的数组圆整
+def _round_array(values: np.ndarray, ndigits: int) -> np.ndarray:
+    '''
+    np.round先乘10**ndigits再取整，在接近0.5的位置可能与round不同，这部分逐个使用round重新计算
+    10**ndigits超过22时不能精确表示，全部使用round计算
+    '''
+    if ndigits > 22:
+        return np.array([round(value, ndigits) for value in values.tolist()], dtype=np.float64)
+    result = np.round(values, ndigits)
+    with np.errstate(invalid='ignore', over='ignore'):
+        scaled = values * 10 ** ndigits
+        suspect = np.isfinite(scaled) & (np.abs(scaled - np.floor(scaled) - 0.5) < 1e-6)
+    if suspect.any():
+        result[suspect] = [round(value, ndigits) for value in values[suspect].tolist()]
+    return result
+
+
+# 批量计算手续费，结果与get_commission_data逐个计算相同
+def get_commission_data_array(
+        posSide,
+        openMoney,
+        openPrice,
+        closePrice,
+        lever,
+        openCommissionRate,
+        closeCommissionRate,
+        structured: bool = False
+) -> Union[dict, np.ndarray]:
+    '''
+    :param posSide: 持仓方向序列 LONG|SHORT，不区分大小写
+    :param openMoney: 开仓金额序列
+    :param openPrice: 开仓价格序列
+    :param closePrice: 平仓价格序列
+    :param lever: 杠杆倍数序列
+    :param openCommissionRate: 开仓手续费率序列
+    :param closeCommissionRate: 平仓手续费率序列
+    :param structured: 是否返回结构化数组
+    以上序列的长度需要相同，也可以传入单个值
+    :return
+        structured = False
+            {
+                'closeMoney' : <np.ndarray>, # LONG保留4个小数位，SHORT不圆整
+                'commission' : <np.ndarray>, # 保留4个小数位
+                'profitRate' : <np.ndarray>, # 保留4个小数位
+            }
+        structured = True
+            np.ndarray[('closeMoney', float64), ('commission', float64), ('profitRate', float64)]
+    例如：
+        get_commission_data_array(
+            posSide=['LONG', 'SHORT'], openMoney=100, openPrice=[10, 10], closePrice=[11, 9],
+            lever=1, openCommissionRate=0.0004, closeCommissionRate=0.0004
+        )
+    '''
+    posSide, openMoney, openPrice, closePrice, lever, openCommissionRate, closeCommissionRate = np.broadcast_arrays(
+        np.asarray(posSide),
+        *[np.asarray(value, dtype=np.float64) for value in
+          (openMoney, openPrice, closePrice, lever, openCommissionRate, closeCommissionRate)]
+    )
+    # 持仓方向只对不同的值转换大小写
+    sides, side_codes = np.unique(posSide.astype(str), return_inverse=True)
+    sides = np.char.upper(sides)
+    for side in sides:
+        if side not in ['LONG', 'SHORT']:
+            raise exception.PosSideException(side)
+    is_long = (sides == 'LONG')[side_codes.reshape(posSide.shape)]
+    buyCommission = openMoney * lever * openCommissionRate
+    sellCommission = np.where(
+        is_long,
+        (closePrice / openPrice) * openMoney * lever * closeCommissionRate,
+        (2 * openPrice - closePrice) / openPrice * openMoney * lever * closeCommissionRate
+    )
+    commission = _round_array(buyCommission + sellCommission, 4)
+    closeMoney = np.where(
+        is_long,
+        _round_array((closePrice - openPrice) / openPrice * lever * openMoney + openMoney - commission, 4),
+        (openPrice - closePrice) / openPrice * openMoney * lever + openMoney - commission
+    )
+    profitRate = _round_array((closeMoney - openMoney) / openMoney, 4)
+    if not structured:
+        return dict(
+            closeMoney=closeMoney,
+            commission=commission,
+            profitRate=profitRate,
+        )
+    result = np.empty(closeMoney.shape, dtype=[
+        ('closeMoney', np.float64),
+        ('commission', np.float64),
+        ('profitRate', np.float64),
+    ])
+    result['closeMoney'] = closeMoney
+    result['commission'] = commission
+    result['profitRate'] = profitRate
+    return result
+
+
 # 用于模拟交易中的的价格圆整，保证圆整后的价格与圆整前相差不超过0.001%
 def round_simulate(price) -> float:
     '''
@@ -76,6 +174,610 @@ def round_simulate(price) -> float:
         return price_round
 
 
+_pow10 = 10 ** np.arange(19, dtype=np.int64)
+
+
+# 批量模拟交易中的价格圆整，小数位使用整数比较计算，不逐个转换字符串
+def round_simulate_array(prices):
+    '''
+    :param prices: 价格序列
+    :return: (np.ndarray:圆整后的价格, np.ndarray[bool]:圆整后与圆整前相差超过0.001%的位置)
+        圆整后的价格与round_simulate逐个计算相同，整数序列原样返回
+    '''
+    prices = np.asarray(prices)
+    if prices.dtype.kind in 'biu':
+        return prices.copy(), np.zeros(prices.shape, dtype=bool)
+    prices = prices.astype(np.float64)
+    result = prices.copy()
+    with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+        price_0_00001 = 0.00001 * prices
+        small = (price_0_00001 < 1) & (prices != 0)
+        inverse = np.trunc(1 / price_0_00001)
+        # 非常接近0的价格无法计算小数位，原样返回并标记
+        overflow = small & ~np.isfinite(inverse)
+        small &= ~overflow
+        # ndigits = len(str(int(1 / price_0_00001)))，负数包含符号位
+        ndigits = np.ones(prices.shape, dtype=np.int64)
+        in_range = small & (np.abs(inverse) < _pow10[-1])
+        ndigits[in_range] = np.maximum(
+            np.searchsorted(_pow10, np.abs(inverse[in_range]).astype(np.int64), side='right'), 1
+        ) + (inverse[in_range] < 0)
+        for i in np.flatnonzero(small & ~in_range):
+            ndigits[i] = len(str(int(1 / price_0_00001[i])))
+        for n in np.unique(ndigits[small]):
+            mask = small & (ndigits == n)
+            result[mask] = _round_array(prices[mask], int(n))
+        large = ~small & ~overflow & (prices != 0)
+        result[large] = _round_array(prices[large], 1)
+        error_mask = overflow | ((prices != 0) & (np.abs((result - prices) / prices) >= 0.00001))
+    return result, error_mask
+
+
+# 交易对的价格与数量规则，预先计算精度与格式，用于频繁的圆整与格式化
+class SymbolRules():
+    def __init__(
+            self,
+            tickSize: str = None,
+            stepSize: str = None,
+            minPrice: str = None,
+            maxPrice: str = None,
+            minQty: str = None,
+            maxQty: str = None
+    ):
+        '''
+        :param tickSize: 价格的最小间隔
+        :param stepSize: 购买数量的最小间隔
+        :param minPrice: 最小价格    None:无下限
+        :param maxPrice: 最大价格    None:无上限
+        :param minQty: 数量下限, 最小数量   None:无下限
+        :param maxQty: 数量上限, 最大数量   None:无上限
+        '''
+        self.tickSize = tickSize
+        self.stepSize = stepSize
+        self.minPrice = minPrice
+        self.maxPrice = maxPrice
+        self.minQty = minQty
+        self.maxQty = maxQty
+        tickSize = self._to_size_str(tickSize)
+        stepSize = self._to_size_str(stepSize)
+        # 圆整的间隔、小数位（None表示取整）与字符串格式
+        self.tick, self.price_ndigits, self.price_format = self._parse_size(tickSize)
+        self.step, self.quantity_ndigits, self.quantity_format = self._parse_size(stepSize)
+        # 定点表示：间隔 = units / 10**decimals，价格与数量保存为间隔的整数倍
+        self.tick_units, self.tick_decimals = self._parse_decimal(tickSize)
+        self.step_units, self.step_decimals = self._parse_decimal(stepSize)
+        self.min_price = float(minPrice) if minPrice else None
+        self.max_price = float(maxPrice) if maxPrice else None
+        self.min_qty = float(minQty) if minQty else None
+        self.max_qty = float(maxQty) if maxQty else None
+
+    def __repr__(self):
+        return 'SymbolRules(tickSize={tickSize}, stepSize={stepSize})'.format(
+            tickSize=repr(self.tickSize),
+            stepSize=repr(self.stepSize),
+        )
+
+    # 数字格式的间隔转化为字符串，例如：5 --> '5'，5.0 --> '5.0'，1e-05 --> '0.00001'
+    @staticmethod
+    def _to_size_str(size):
+        if size is None or isinstance(size, str):
+            return size
+        try:
+            return format(Decimal(repr(size) if isinstance(size, float) else str(size)), 'f')
+        except InvalidOperation:
+            raise exception.ParamException('size must be a decimal, size={size}'.format(size=size))
+
+    # 间隔、圆整的小数位与字符串格式
+    @staticmethod
+    def _parse_size(size: str):
+        if size is None:
+            return None, None, None
+        value = float(size)
+        m = len(re.sub('0+$', '', size).split('.', maxsplit=1)[-1])  # 小数位
+        ndigits = m if '.' in size else None
+        d_format = '%.{m}f'.format(m=0 if value >= 1 else m)
+        return value, ndigits, d_format
+
+    # 间隔的精确十进制表示 (units, decimals)
+    @staticmethod
+    def _parse_decimal(size: str):
+        if size is None:
+            return None, None
+        try:
+            sign, digits, exponent = Decimal(size).normalize().as_tuple()
+        except InvalidOperation:
+            raise exception.ParamException('size must be a decimal string, size={size}'.format(size=size))
+        units = int(''.join(map(str, digits)))
+        if sign or units == 0:
+            raise exception.ParamException('size must be positive, size={size}'.format(size=size))
+        if exponent >= 0:
+            return units * 10 ** exponent, 0
+        return units, -exponent
+
+    # 检查规则中是否设置了间隔
+    @staticmethod
+    def _check_size(value, name: str):
+        if value is None:
+            raise exception.ParamException('{name} is not set in SymbolRules'.format(name=name))
+
+    # 圆整购买数量，结果同round_quantity
+    def round_quantity(self, quantity) -> dict:
+        '''
+        :param quantity: 输入数量
+        '''
+        step = self.step
+        self._check_size(step, 'stepSize')
+        if quantity / step != int(quantity / step):
+            quantity = quantity // step * step
+        if self.quantity_ndigits is None:
+            quantity = int(quantity)
+        else:
+            quantity = round(quantity, self.quantity_ndigits)
+        result = {
+            'code': 0,
+            'data': quantity,
+            'msg': ''
+        }
+        if self.min_qty is not None and quantity < self.min_qty:
+            result['code'] = -1
+            result['msg'] = f'quantity={quantity} minQty={self.minQty}'
+        elif self.max_qty is not None and quantity > self.max_qty:
+            result['code'] = -2
+            result['msg'] = f'quantity={quantity} maxQty={self.maxQty}'
+        return result
+
+    # 圆整购买价格，结果同round_price
+    def round_price(self, price, type: Literal['CEIL', 'FLOOR', 'ceil', 'floor']) -> dict:
+        '''
+        :param price: 购买价格
+        :param type: 圆整方式
+            CEIL:   向上圆整
+            FLOOR:  向下圆整
+        '''
+        type = type.upper()
+        if type not in ['CEIL', 'FLOOR']:
+            msg = 'type must in ["CEIL","FLOOR"]'
+            raise exception.ParamException(msg)
+        tick = self.tick
+        self._check_size(tick, 'tickSize')
+        if price / tick != int(price / tick):
+            if type == 'CEIL':
+                price = (price // tick + 1) * tick
+            else:
+                price = price // tick * tick
+        if self.price_ndigits is None:
+            price = int(price)
+        else:
+            price = round(price, self.price_ndigits)
+        result = {
+            'code': 0,
+            'data': price,
+            'msg': ''
+        }
+        if self.min_price is not None and price < self.min_price:
+            result['code'] = -1
+            result['msg'] = f'price={price} minPrice={self.minPrice}'
+        elif self.max_price is not None and price > self.max_price:
+            result['code'] = -2
+            result['msg'] = f'price={price} maxPrice={self.maxPrice}'
+        return result
+
+    # 根据开仓金额、开仓价格、杠杆获取可以开仓的数量，结果同get_quantity
+    def get_quantity(
+            self,
+            openPrice: Union[int, float],
+            openMoney: Union[int, float],
+            lever: int = 1
+    ) -> dict:
+        '''
+        :param openPrice: 开仓价格
+        :param openMoney: 开仓金额
+        :param lever: 杠杆倍数
+        '''
+        return self.round_quantity(openMoney * lever / openPrice)
+
+    # 将开仓数量转化为字符串，结果同quantity_to_f
+    def quantity_to_f(self, quantity: Union[int, float]) -> dict:
+        '''
+        :param quantity: 开仓数量
+        '''
+        self._check_size(self.step, 'stepSize')
+        quantity_f = self.quantity_format % quantity
+        if float(quantity_f) != quantity:
+            return {
+                'code': -1,
+                'data': quantity_f,
+                'msg': f'quantity_f != quantity quantity = {quantity} quantity_f = {quantity_f}',
+            }
+        return {
+            'code': 0,
+            'data': quantity_f,
+            'msg': ''
+        }
+
+    # 将开仓价格转化为字符串，结果同price_to_f
+    def price_to_f(self, price: Union[int, float]) -> dict:
+        '''
+        :param price: 开仓价格
+        '''
+        self._check_size(self.tick, 'tickSize')
+        price_f = self.price_format % price
+        if float(price_f) != price:
+            return {
+                'code': -1,
+                'data': price_f,
+                'msg': f'price_f != price price= {price} price_f= {price_f}',
+            }
+        return {
+            'code': 0,
+            'data': price_f,
+            'msg': ''
+        }
+
+    # 按照间隔圆整数组，与round_quantity、round_price的逐个计算相同
+    @staticmethod
+    def _round_values(values, size: float, ndigits: int, ceil: bool = False) -> np.ndarray:
+        values = np.asarray(values, dtype=np.float64)
+        if not np.isfinite(values).all():
+            raise exception.ParamException('values must be finite numbers')
+        ratio = values / size
+        if ceil:
+            rounded = (values // size + 1) * size
+        else:
+            rounded = values // size * size
+        values = np.where(ratio == np.trunc(ratio), values, rounded)
+        if ndigits is None:
+            return np.trunc(values).astype(np.int64)
+        return _round_array(values, ndigits)
+
+    # 上下限检查的状态码
+    @staticmethod
+    def _get_codes(values: np.ndarray, min_value: float, max_value: float) -> np.ndarray:
+        codes = np.zeros(values.shape, dtype=np.int8)
+        if max_value is not None:
+            codes[values > max_value] = -2
+        if min_value is not None:
+            codes[values < min_value] = -1
+        return codes
+
+    # 批量圆整购买数量
+    def round_quantity_array(self, quantities):
+        '''
+        :param quantities: 数量序列
+        :return: (np.ndarray:圆整后的数量, np.ndarray[int8]:状态码)，状态码同round_quantity
+        '''
+        self._check_size(self.step, 'stepSize')
+        quantities = self._round_values(quantities, self.step, self.quantity_ndigits)
+        return quantities, self._get_codes(quantities, self.min_qty, self.max_qty)
+
+    # 批量圆整购买价格
+    def round_price_array(self, prices, type: Literal['CEIL', 'FLOOR', 'ceil', 'floor']):
+        '''
+        :param prices: 价格序列
+        :param type: 圆整方式
+            CEIL:   向上圆整
+            FLOOR:  向下圆整
+        :return: (np.ndarray:圆整后的价格, np.ndarray[int8]:状态码)，状态码同round_price
+        '''
+        type = type.upper()
+        if type not in ['CEIL', 'FLOOR']:
+            msg = 'type must in ["CEIL","FLOOR"]'
+            raise exception.ParamException(msg)
+        self._check_size(self.tick, 'tickSize')
+        prices = self._round_values(prices, self.tick, self.price_ndigits, ceil=type == 'CEIL')
+        return prices, self._get_codes(prices, self.min_price, self.max_price)
+
+    # 批量格式化，检查转换后的字符串与数字是否相等
+    @staticmethod
+    def _format_values(values, d_format: str, encode: bool = False):
+        values = np.asarray(values)
+        if values.ndim == 0:
+            values = values.reshape(1)
+        texts = [d_format % value for value in values.tolist()]
+        parsed = np.fromiter(map(float, texts), dtype=np.float64, count=len(texts))
+        mismatch = np.flatnonzero(parsed != values)
+        texts = np.array(texts, dtype=str)
+        if encode:
+            texts = texts.astype(bytes)
+        return texts, mismatch
+
+    # 批量将开仓价格转化为字符串
+    def prices_to_f(self, prices, encode: bool = False):
+        '''
+        :param prices: 价格序列
+        :param encode: 是否返回bytes数组
+        :return: (np.ndarray[str|bytes]:price_f, np.ndarray[int64]:转换后与原价格不相等的索引)
+        '''
+        self._check_size(self.tick, 'tickSize')
+        return self._format_values(prices, self.price_format, encode)
+
+    # 批量将开仓数量转化为字符串
+    def quantities_to_f(self, quantities, encode: bool = False):
+        '''
+        :param quantities: 数量序列
+        :param encode: 是否返回bytes数组
+        :return: (np.ndarray[str|bytes]:quantity_f, np.ndarray[int64]:转换后与原数量不相等的索引)
+        '''
+        self._check_size(self.step, 'stepSize')
+        return self._format_values(quantities, self.quantity_format, encode)
+
+    # 批量将订单的价格与数量转化为字符串
+    def orders_to_f(self, prices, quantities, encode: bool = False) -> dict:
+        '''
+        :param prices: 价格序列
+        :param quantities: 数量序列，长度与prices相同
+        :param encode: 是否返回bytes数组
+        :return:
+            {
+                'price' : <np.ndarray:price_f>,
+                'quantity' : <np.ndarray:quantity_f>,
+                'mismatch' : <np.ndarray[int64]:价格或数量转换后不相等的订单索引>,
+            }
+        '''
+        price_f, price_mismatch = self.prices_to_f(prices, encode)
+        quantity_f, quantity_mismatch = self.quantities_to_f(quantities, encode)
+        if len(price_f) != len(quantity_f):
+            raise exception.ParamException('prices and quantities must have the same length')
+        return dict(
+            price=price_f,
+            quantity=quantity_f,
+            mismatch=np.union1d(price_mismatch, quantity_mismatch),
+        )
+
+    # 生成网格订单的价格与数量
+    def get_ladder(
+            self,
+            startPrice: Union[int, float],
+            num: int,
+            openMoney,
+            stepPrice: Union[int, float] = None,
+            stepRate: Union[int, float] = None,
+            type: Literal['CEIL', 'FLOOR', 'ceil', 'floor'] = 'FLOOR',
+            lever: Union[int, float] = 1
+    ) -> dict:
+        '''
+        :param startPrice: 第一档价格
+        :param num: 档位数量
+        :param openMoney: 每档开仓金额，可以是长度为num的序列
+        :param stepPrice: 相邻档位的价格间隔，负数向下
+        :param stepRate: 相邻档位的价格比例，例如0.01表示每档上涨1%，-0.01表示每档下跌1%
+            stepPrice与stepRate需要设置其中一个
+        :param type: 价格圆整方式
+            CEIL:   向上圆整
+            FLOOR:  向下圆整
+        :param lever: 杠杆倍数
+        :return: 结果同get_order_ladder
+        '''
+        if (stepPrice is None) == (stepRate is None):
+            raise exception.ParamException('one of stepPrice and stepRate must be set')
+        index = np.arange(num, dtype=np.float64)
+        if stepPrice is not None:
+            prices = startPrice + index * stepPrice
+        else:
+            prices = startPrice * (1 + stepRate) ** index
+        if not (prices > 0).all():
+            raise exception.ParamException('ladder prices must be positive')
+        prices, priceCode = self.round_price_array(prices, type)
+        if not (prices > 0).all():
+            raise exception.ParamException('rounded ladder prices must be positive')
+        quantities, quantityCode = self.round_quantity_array(
+            np.asarray(openMoney, dtype=np.float64) * lever / prices)
+        price_f, price_mismatch = self.prices_to_f(prices)
+        quantity_f, quantity_mismatch = self.quantities_to_f(quantities)
+        valid = (priceCode == 0) & (quantityCode == 0) & (quantities > 0)
+        valid[price_mismatch] = False
+        valid[quantity_mismatch] = False
+        return dict(
+            price=prices,
+            quantity=quantities,
+            price_f=price_f,
+            quantity_f=quantity_f,
+            priceCode=priceCode,
+            quantityCode=quantityCode,
+            valid=valid,
+        )
+
+    # 数值转化为间隔的整数倍
+    @staticmethod
+    def _to_ticks(values, units: int, decimals: int, type: str) -> np.ndarray:
+        type = type.upper()
+        if type not in ['CEIL', 'FLOOR', 'ROUND']:
+            msg = 'type must in ["CEIL","FLOOR","ROUND"]'
+            raise exception.ParamException(msg)
+        values = np.asarray(values, dtype=np.float64)
+        ratio = values * 10 ** decimals / units
+        if not (np.abs(ratio) < 2 ** 62).all():
+            raise exception.ParamException('values must be finite and within int64 ticks')
+        # 浮点误差范围内的整数倍视为精确值，保证结果确定
+        # 容差为固定的间隔比例，只在数值过大时放宽到ratio本身的浮点精度，不随数值等比放大
+        nearest = np.rint(ratio)
+        exact = np.abs(ratio - nearest) <= np.maximum(1e-9, 4 * np.spacing(np.abs(ratio)))
+        if type == 'CEIL':
+            ticks = np.where(exact, nearest, np.ceil(ratio))
+        elif type == 'FLOOR':
+            ticks = np.where(exact, nearest, np.floor(ratio))
+        else:
+            ticks = nearest
+        return ticks.astype(np.int64)
+
+    # 间隔的整数倍转化为数值，与float(字符串)相同
+    @staticmethod
+    def _from_ticks(ticks, units: int, decimals: int) -> np.ndarray:
+        return np.asarray(ticks, dtype=np.int64) * units / 10 ** decimals
+
+    # 间隔的整数倍转化为精确的字符串，只使用整数运算
+    @staticmethod
+    def _format_ticks(ticks, units: int, decimals: int) -> np.ndarray:
+        values = np.asarray(ticks, dtype=np.int64) * units
+        scale = 10 ** decimals
+        texts = (np.abs(values) // scale).astype(str)
+        if decimals:
+            fractions = np.char.zfill((np.abs(values) % scale).astype(str), decimals)
+            texts = np.char.add(np.char.add(texts, '.'), fractions)
+        return np.where(values < 0, np.char.add('-', texts), texts)
+
+    # 价格转化为tickSize的整数倍
+    def price_to_ticks(self, prices, type: Literal['CEIL', 'FLOOR', 'ROUND'] = 'ROUND') -> np.ndarray:
+        '''
+        :param prices: 价格序列
+        :param type: 圆整方式
+            CEIL:   向上圆整
+            FLOOR:  向下圆整
+            ROUND:  四舍五入到最近的间隔
+        :return: np.ndarray[int64]
+        '''
+        self._check_size(self.tick, 'tickSize')
+        return self._to_ticks(prices, self.tick_units, self.tick_decimals, type)
+
+    # tickSize的整数倍转化为价格
+    def ticks_to_price(self, ticks) -> np.ndarray:
+        '''
+        :param ticks: tickSize的整数倍序列
+        :return: np.ndarray[float64]
+        '''
+        self._check_size(self.tick, 'tickSize')
+        return self._from_ticks(ticks, self.tick_units, self.tick_decimals)
+
+    # tickSize的整数倍转化为价格字符串
+    def ticks_to_price_f(self, ticks) -> np.ndarray:
+        '''
+        :param ticks: tickSize的整数倍序列
+        :return: np.ndarray[str] 小数位与tickSize相同
+        '''
+        self._check_size(self.tick, 'tickSize')
+        return self._format_ticks(ticks, self.tick_units, self.tick_decimals)
+
+    # 数量转化为stepSize的整数倍
+    def quantity_to_steps(self, quantities, type: Literal['CEIL', 'FLOOR', 'ROUND'] = 'FLOOR') -> np.ndarray:
+        '''
+        :param quantities: 数量序列
+        :param type: 圆整方式，默认向下圆整，同round_quantity
+        :return: np.ndarray[int64]
+        '''
+        self._check_size(self.step, 'stepSize')
+        return self._to_ticks(quantities, self.step_units, self.step_decimals, type)
+
+    # stepSize的整数倍转化为数量
+    def steps_to_quantity(self, steps) -> np.ndarray:
+        '''
+        :param steps: stepSize的整数倍序列
+        :return: np.ndarray[float64]
+        '''
+        self._check_size(self.step, 'stepSize')
+        return self._from_ticks(steps, self.step_units, self.step_decimals)
+
+    # stepSize的整数倍转化为数量字符串
+    def steps_to_quantity_f(self, steps) -> np.ndarray:
+        '''
+        :param steps: stepSize的整数倍序列
+        :return: np.ndarray[str] 小数位与stepSize相同
+        '''
+        self._check_size(self.step, 'stepSize')
+        return self._format_ticks(steps, self.step_units, self.step_decimals)
+
+    # 价格与数量的整数倍相乘得到的名义金额，单位为10**-(价格小数位+数量小数位)
+    # 乘积可能超出int64，使用Python整数(object数组)计算，不会溢出
+    def _get_notional_units(self, ticks, steps) -> np.ndarray:
+        self._check_size(self.tick, 'tickSize')
+        self._check_size(self.step, 'stepSize')
+        ticks = np.asarray(ticks, dtype=np.int64).astype(object)
+        steps = np.asarray(steps, dtype=np.int64).astype(object)
+        return ticks * steps * (self.tick_units * self.step_units)
+
+    # 名义金额（价格 * 数量）
+    def get_notional(self, ticks, steps) -> np.ndarray:
+        '''
+        :param ticks: 价格的tickSize整数倍序列
+        :param steps: 数量的stepSize整数倍序列
+        :return: np.ndarray[float64] 整数运算后只做一次除法
+        '''
+        units = self._get_notional_units(ticks, steps)
+        return np.asarray(units / 10 ** (self.tick_decimals + self.step_decimals), dtype=np.float64)
+
+    # 使用定点表示计算手续费，公式同get_commission_data
+    def get_commission_data_ticks(
+            self,
+            posSide: Literal['long', 'short', 'LONG', 'SHORT'],
+            openTicks,
+            closeTicks,
+            steps,
+            lever: Union[int, float],
+            openCommissionRate: Union[int, float],
+            closeCommissionRate: Union[int, float]
+    ) -> dict:
+        '''
+        :param posSide: 持仓方向
+            LONG:   多单
+            SHORT:  空单
+        :param openTicks: 开仓价格的tickSize整数倍
+        :param closeTicks: 平仓价格的tickSize整数倍
+        :param steps: 开仓数量的stepSize整数倍
+        :param lever: 杠杆倍数，开仓金额 = 开仓价格 * 数量 / lever
+        :param openCommissionRate: 开仓手续费率
+        :param closeCommissionRate: 平仓手续费率
+        :return
+            {
+                'closeMoney' : <平仓剩余金额>, # 保留4个小数位
+                'commission' : <开仓与平仓手续费之和>, # 保留4个小数位
+                'profitRate' : <利润率>, # 保留4个小数位
+            }
+        盈亏使用整数计算，LONG与SHORT的平仓剩余金额都保留4个小数位
+        '''
+        posSide = posSide.upper()
+        if posSide not in ['LONG', 'SHORT']:
+            raise exception.PosSideException(posSide)
+        scale = 10 ** (self.tick_decimals + self.step_decimals)
+        open_units = int(self._get_notional_units(openTicks, steps))
+        close_units = int(self._get_notional_units(closeTicks, steps))
+        if posSide == 'LONG':
+            profit_units = close_units - open_units
+            sell_units = close_units
+        else:
+            profit_units = open_units - close_units
+            sell_units = 2 * open_units - close_units
+        openMoney = open_units / scale / lever
+        commission = round((open_units * openCommissionRate + sell_units * closeCommissionRate) / scale, 4)
+        closeMoney = round(openMoney + profit_units / scale - commission, 4)
+        profitRate = round((closeMoney - openMoney) / openMoney, 4)
+        return dict(
+            closeMoney=closeMoney,
+            commission=commission,
+            profitRate=profitRate,
+        )
+
+
+_rules_cache = Cache(maxsize=4096)
+
+
+# 获取交易对规则对象，相同的参数只解析一次
+def get_symbol_rules(
+        tickSize: str = None,
+        stepSize: str = None,
+        minPrice: str = None,
+        maxPrice: str = None,
+        minQty: str = None,
+        maxQty: str = None
+) -> SymbolRules:
+    '''
+    :param tickSize: 价格的最小间隔
+    :param stepSize: 购买数量的最小间隔
+    :param minPrice: 最小价格
+    :param maxPrice: 最大价格
+    :param minQty: 数量下限
+    :param maxQty: 数量上限
+    例如：
+        rules = get_symbol_rules(tickSize='0.01', stepSize='0.001', minQty='0.001')
+        rules.round_price(price=52.123, type='CEIL')
+        rules.quantity_to_f(quantity=0.012)
+    '''
+    key = (tickSize, stepSize, minPrice, maxPrice, minQty, maxQty)
+    rules = _rules_cache.get(key)
+    if rules is None:
+        rules = SymbolRules(*key)
+        _rules_cache.set(key, rules)
+    return rules
+
+
 # 圆整购买数量
 def round_quantity(
         quantity,
@@ -100,31 +802,7 @@ def round_quantity(
             -1    小于minQty
             -2    大于maxQty
     '''
-
-    # 数字对象
-    if quantity / float(stepSize) == int(quantity / float(stepSize)):
-        quantity = quantity
-    else:
-        quantity = quantity // float(stepSize) * float(
-            stepSize)  # quantity = 52.123 stepSize = 0.01 --> quantity = 52.1
-    if '.' in stepSize:
-        stepSize = re.sub('0+$', '', stepSize)
-        m = len(stepSize.split('.', maxsplit=1)[-1])  # 小数位
-        quantity = round(quantity, m)
-    else:
-        quantity = int(quantity)
-    result = {
-        'code': 0,
-        'data': quantity,
-        'msg': ''
-    }
-    if minQty and quantity < float(minQty):
-        result['code'] = -1
-        result['msg'] = f'quantity={quantity} minQty={minQty}'
-    elif maxQty and quantity > float(maxQty):
-        result['code'] = -2
-        result['msg'] = f'quantity={quantity} maxQty={maxQty}'
-    return result
+    return get_symbol_rules(stepSize=stepSize, minQty=minQty, maxQty=maxQty).round_quantity(quantity)
 
 
 # 圆整购买价格
@@ -156,38 +834,57 @@ def round_price(
             -1    小于minPrice
             -2    大于maxPrice
     '''
-    # 向下或向上圆整
-    type = type.upper()
-    if type not in ['CEIL', 'FLOOR']:
-        msg = 'type must in ["CEIL","FLOOR"]'
-        raise exception.ParamException(msg)
-    if price / float(tickSize) == int(price / float(tickSize)):
-        price = price
-    else:
-        if type == 'CEIL':
-            price = (price // float(tickSize) + 1) * float(tickSize)  # price = 52.123 tickSize = 0.01 --> price = 52.2
-        else:
-            price = price // float(tickSize) * float(tickSize)  # price = 52.123 tickSize = 0.01 --> price = 52.1
+    return get_symbol_rules(tickSize=tickSize, minPrice=minPrice, maxPrice=maxPrice).round_price(price, type)
 
-    if '.' in tickSize:
-        tickSize = re.sub('0+$', '', tickSize)
-        m = len(tickSize.split('.', maxsplit=1)[-1])  # 小数位
-        price = round(price, m)
-    else:
-        price = int(price)
-
-    result = {
-        'code': 0,
-        'data': price,
-        'msg': ''
-    }
-    if minPrice and price < float(minPrice):
-        result['code'] = -1
-        result['msg'] = f'price={price} minPrice={minPrice}'
-    elif maxPrice and price > float(maxPrice):
-        result['code'] = -2
-        result['msg'] = f'price={price} maxPrice={maxPrice}'
-    return result
+
+# 批量圆整购买数量
+def round_quantity_array(
+        quantities,
+        stepSize: str,
+        minQty: str = None,
+        maxQty: str = None
+):
+    '''
+    :param quantities: 数量序列
+    :param stepSize: 购买数量的最小间隔
+    :param minQty: 数量下限, 最小数量   None:无下限
+    :param maxQty: 数量上限, 最大数量   None:无上限
+    :return: (np.ndarray:圆整后的数量, np.ndarray[int8]:状态码)
+        stepSize没有小数点时数量为int64，否则为float64
+        状态码同round_quantity
+            0     属于 minQty~maxQty之间
+            -1    小于minQty
+            -2    大于maxQty
+    '''
+    return get_symbol_rules(stepSize=stepSize, minQty=minQty, maxQty=maxQty).round_quantity_array(quantities)
+
+
+# 批量圆整购买价格
+def round_price_array(
+        prices,
+        type: Literal['CEIL', 'FLOOR', 'ceil', 'floor'],
+        tickSize: str,
+        minPrice: str = None,
+        maxPrice: str = None
+):
+    '''
+    :param prices: 价格序列
+    :param type: 圆整方式
+        CEIL:   向上圆整
+        FLOOR:  向下圆整
+    :param tickSize: 价格的最小间隔
+    :param minPrice: 最小价格
+    :param maxPrice: 最大价格
+    :return: (np.ndarray:圆整后的价格, np.ndarray[int8]:状态码)
+        tickSize没有小数点时价格为int64，否则为float64
+        状态码同round_price
+            0     属于 minPrice~maxPrice之间
+            -1    小于minPrice
+            -2    大于maxPrice
+    例如：
+        prices, codes = round_price_array(prices=[52.123, 52.2], type='CEIL', tickSize='0.01', minPrice='0.01')
+    '''
+    return get_symbol_rules(tickSize=tickSize, minPrice=minPrice, maxPrice=maxPrice).round_price_array(prices, type)
 
 
 # 根据开仓金额、开仓价格、杠杆获取可以开仓的数量
@@ -237,27 +934,7 @@ def quantity_to_f(
             0   正确
             -1  转换后字符串格式quantity与数字格式quantity不相等
     '''
-    # m 小数位
-    if float(stepSize) >= 1:
-        m = 0
-    else:
-        stepSize = re.sub('0+$', '', stepSize)
-        m = len(stepSize.split('.', maxsplit=1)[-1])
-    d_format = '%.{m}f'.format(m=m)
-    quantity_f = d_format % quantity
-    if float(quantity_f) != quantity:
-        result = {
-            'code': -1,
-            'data': quantity_f,
-            'msg': f'quantity_f != quantity quantity = {quantity} quantity_f = {quantity_f}',
-        }
-    else:
-        result = {
-            'code': 0,
-            'data': quantity_f,
-            'msg': ''
-        }
-    return result
+    return get_symbol_rules(stepSize=stepSize).quantity_to_f(quantity)
 
 
 # 将开仓价格转化为字符串
@@ -279,24 +956,95 @@ def price_to_f(
             0   正确
             -1  转换后字符串格式price与数字格式price不相等
     '''
-    # m 小数位
-    if float(tickSize) >= 1:
-        m = 0
-    else:
-        tickSize = re.sub('0+$', '', tickSize)
-        m = len(tickSize.split('.', maxsplit=1)[-1])
-    d_format = '%.{m}f'.format(m=m)
-    price_f = d_format % price
-    if float(price_f) != price:
-        result = {
-            'code': -1,
-            'data': price_f,
-            'msg': f'price_f != price price= {price} price_f= {price_f}',
+    return get_symbol_rules(tickSize=tickSize).price_to_f(price)
+
+
+# 批量将订单的价格与数量转化为字符串，检查方式同price_to_f、quantity_to_f
+def orders_to_f(
+        prices,
+        quantities,
+        tickSize: str,
+        stepSize: str,
+        encode: bool = False
+) -> dict:
+    '''
+    :param prices: 价格序列
+    :param quantities: 数量序列，长度与prices相同
+    :param tickSize: 价格的最小间隔
+    :param stepSize: 购买数量的最小间隔
+    :param encode: 是否返回bytes数组，可以直接用于拼接请求体
+    :return:
+        {
+            'price' : <np.ndarray:price_f>,
+            'quantity' : <np.ndarray:quantity_f>,
+            'mismatch' : <np.ndarray[int64]:价格或数量转换后不相等的订单索引>,
         }
-    else:
-        result = {
-            'code': 0,
-            'data': price_f,
-            'msg': ''
+    例如：
+        orders_to_f(prices=[52.12, 52.13], quantities=[0.01, 0.02], tickSize='0.01', stepSize='0.001')
+    '''
+    return get_symbol_rules(tickSize=tickSize, stepSize=stepSize).orders_to_f(prices, quantities, encode)
+
+
+# 生成网格订单，一次计算全部档位的圆整价格、数量、字符串与状态码
+def get_order_ladder(
+        startPrice: Union[int, float],
+        num: int,
+        openMoney,
+        tickSize: str,
+        stepSize: str,
+        stepPrice: Union[int, float] = None,
+        stepRate: Union[int, float] = None,
+        type: Literal['CEIL', 'FLOOR', 'ceil', 'floor'] = 'FLOOR',
+        lever: Union[int, float] = 1,
+        minPrice: str = None,
+        maxPrice: str = None,
+        minQty: str = None,
+        maxQty: str = None
+) -> dict:
+    '''
+    :param startPrice: 第一档价格
+    :param num: 档位数量
+    :param openMoney: 每档开仓金额，可以是长度为num的序列
+    :param tickSize: 价格的最小间隔
+    :param stepSize: 购买数量的最小间隔
+    :param stepPrice: 相邻档位的价格间隔，负数向下
+    :param stepRate: 相邻档位的价格比例，例如0.01表示每档上涨1%，-0.01表示每档下跌1%
+        stepPrice与stepRate需要设置其中一个
+    :param type: 价格圆整方式
+        CEIL:   向上圆整
+        FLOOR:  向下圆整
+    :param lever: 杠杆倍数
+    :param minPrice: 最小价格
+    :param maxPrice: 最大价格
+    :param minQty: 数量下限
+    :param maxQty: 数量上限
+    :return:
+        {
+            'price' : <np.ndarray:圆整后的价格>, # 同round_price
+            'quantity' : <np.ndarray:可以开仓的数量>, # 同get_quantity
+            'price_f' : <np.ndarray[str]>, # 同price_to_f
+            'quantity_f' : <np.ndarray[str]>, # 同quantity_to_f
+            'priceCode' : <np.ndarray[int8]>, # 同round_price的code
+            'quantityCode' : <np.ndarray[int8]>, # 同get_quantity的code
+            'valid' : <np.ndarray[bool]>, # 状态码均为0、数量大于0且字符串转换一致
         }
-    return result
+    例如：
+        get_order_ladder(startPrice=100, num=10, openMoney=20, tickSize='0.01', stepSize='0.001', stepRate=-0.005)
+    '''
+    rules = get_symbol_rules(
+        tickSize=tickSize,
+        stepSize=stepSize,
+        minPrice=minPrice,
+        maxPrice=maxPrice,
+        minQty=minQty,
+        maxQty=maxQty,
+    )
+    return rules.get_ladder(
+        startPrice=startPrice,
+        num=num,
+        openMoney=openMoney,
+        stepPrice=stepPrice,
+        stepRate=stepRate,
+        type=type,
+        lever=lever,
+    )
@@ -1,8 +1,173 @@
-from multiprocessing import Process, Manager
+from typing import Union
+from multiprocessing import Process, Manager, Pipe, shared_memory, resource_tracker
+from multiprocessing.connection import wait
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from collections import deque
+import importlib
+import queue
+import functools
+import weakref
+import threading
+import asyncio
 import traceback
 import time
+import sys
+import numpy as np
+import pandas as pd
 from paux import exception
 
+# 进程中已经连接的共享内存 name -> (SharedMemory, 没有数组引用时mmap的引用计数)，每个任务或每批任务结束后释放
+_shared_cache = {}
+
+
+# 在创建子进程之前启动resource_tracker，子进程与主进程共用，避免子进程退出时删除共享内存
+def _ensure_resource_tracker():
+    if sys.platform != 'win32':
+        resource_tracker.ensure_running()
+
+
+# 连接已经存在的共享内存，由创建共享内存的进程负责删除
+def _attach_shared_memory(name: str):
+    item = _shared_cache.get(name)
+    if item is None:
+        if sys.version_info >= (3, 13):
+            shm = shared_memory.SharedMemory(name=name, track=False)
+        # 与主进程共用resource_tracker，重复注册不影响主进程的删除
+        else:
+            shm = shared_memory.SharedMemory(name=name)
+        item = (shm, sys.getrefcount(shm._mmap))
+        _shared_cache[name] = item
+    return item[0]
+
+
+# 释放已经连接的共享内存，避免常驻进程一直映射已经删除的共享内存
+# numpy数组直接引用mmap，关闭后访问仍存在的视图会导致进程崩溃
+# 因此仍被引用的（例如任务把视图保存在全局变量中）不释放，保留到下一次释放
+def _release_shared_memory():
+    for name, (shm, refcount) in list(_shared_cache.items()):
+        if sys.getrefcount(shm._mmap) > refcount:
+            continue
+        shm.close()
+        del _shared_cache[name]
+
+
+# 共享内存中的numpy数组，序列化时只传递名称、形状与类型
+class SharedArray():
+    '''
+    例如：
+        with SharedArray(np.arange(10 ** 8)) as shared:
+            pool_worker(params=[{'data': shared, 'n': n} for n in range(100)], func=func, transport='pipe')
+        func中的data为只读的np.ndarray
+    '''
+
+    def __init__(self, array: np.ndarray):
+        '''
+        :param array: numpy数组，不支持object类型
+        '''
+        array = np.ascontiguousarray(array)
+        if array.dtype.hasobject:
+            raise exception.ParamException('SharedArray does not support object dtype')
+        self.shape = array.shape
+        self.dtype = array.dtype
+        self.shm = shared_memory.SharedMemory(create=True, size=max(array.nbytes, 1))
+        self.name = self.shm.name
+        self.owner = True  # 创建共享内存的进程负责释放
+        np.ndarray(self.shape, dtype=self.dtype, buffer=self.shm.buf)[...] = array
+
+    def __getstate__(self):
+        return {'name': self.name, 'shape': self.shape, 'dtype': self.dtype}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self.shm = None
+        self.owner = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # 只读的数组视图，不复制数据
+    def get(self) -> np.ndarray:
+        shm = self.shm if self.shm is not None else _attach_shared_memory(self.name)
+        array = np.ndarray(self.shape, dtype=self.dtype, buffer=shm.buf)
+        array.flags.writeable = False
+        return array
+
+    # 释放共享内存，只有创建者会删除共享内存
+    def close(self):
+        if self.owner and self.shm is not None:
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
+
+
+# 共享内存中的DataFrame，数值与日期列保存为SharedArray，其他列随参数序列化
+class SharedFrame():
+    def __init__(self, frame: pd.DataFrame):
+        '''
+        :param frame: DataFrame
+        '''
+        self.columns = frame.columns  # 包含列名称columns.name
+        self.index_names = frame.index.names  # 索引保存为SharedArray时不包含名称
+        self.values = [self._share(frame.iloc[:, i]) for i in range(frame.shape[1])]
+        self.index = self._share(frame.index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.close()
+
+    # 只有numpy数值与日期类型放入共享内存，扩展类型（category、Int64、带时区的日期等）保持原样
+    @staticmethod
+    def _share(values):
+        if isinstance(values.dtype, np.dtype) and values.dtype.kind in 'biufcmM':
+            return SharedArray(values.to_numpy())
+        return values
+
+    # 只读的DataFrame，数值与日期列不复制数据，其他列保持原来的类型
+    def get(self) -> pd.DataFrame:
+        values = [value.get() if isinstance(value, SharedArray) else value.array for value in self.values]
+        index = self.index.get() if isinstance(self.index, SharedArray) else self.index
+        frame = pd.DataFrame(
+            dict(enumerate(values)),
+            index=index,
+            copy=False,
+        )
+        frame.columns = self.columns
+        frame.index.names = self.index_names
+        return frame
+
+    # 释放共享内存
+    def close(self):
+        for value in self.values + [self.index]:
+            if isinstance(value, SharedArray):
+                value.close()
+
+
+# 将numpy数组或DataFrame放入共享内存，作为pool_worker的参数只传递名称，进程中得到只读视图
+def share(data: Union[np.ndarray, pd.DataFrame]) -> Union[SharedArray, SharedFrame]:
+    '''
+    :param data: np.ndarray|pd.DataFrame
+    :return: SharedArray|SharedFrame，使用完毕后调用close()释放，或使用with
+    例如：
+        with share(df) as shared_df:
+            pool_worker(params=[{'df': shared_df, 'n': n} for n in range(100)], func=func, transport='pipe')
+    '''
+    if isinstance(data, pd.DataFrame):
+        return SharedFrame(data)
+    return SharedArray(np.asarray(data))
+
+
+# 将参数中的共享内存对象转换为只读视图，返回新的参数，不修改原参数
+def _resolve_param(param: dict) -> dict:
+    return {
+        key: value.get() if isinstance(value, (SharedArray, SharedFrame)) else value for key, value in param.items()
+    }
+
 
 # 进程工作者
 def _pool_worker(q_param, q_result):
@@ -12,50 +177,526 @@ def _pool_worker(q_param, q_result):
     '''
     while True:
         try:
-            data = q_param.get(block=False, timeout=0)
-            index = data['index']  # 索引
-            param = data['param']  # 函数的执行参数
-            skip_exception = data['skip_exception']  # 遇到异常不会终止工作器
-            func = param['func']  # 函数
-            del param['func']
-        except:
+            data = q_param.get(block=False)
+        except queue.Empty:
             break
-        if skip_exception:
-            try:
-                ret = func(**param)
-                q_result.put(
-                    {
-                        'index': index,
-                        'data': ret
-                    }
-                )
-            except:
-                print(traceback.format_exc())
-        else:
-            ret = func(**param)
+        index = data['index']  # 索引
+        param = data['param']  # 函数的执行参数
+        skip_exception = data['skip_exception']  # 遇到异常不会终止工作器
+        func = param['func']  # 函数
+        del param['func']
+        # 共享内存参数的转换、执行与结果序列化的异常均作为这个任务的错误返回，同Pool
+        try:
+            q_result.put(
+                {
+                    'index': index,
+                    'success': True,
+                    'data': func(**_resolve_param(param))
+                }
+            )
+        except Exception:
             q_result.put(
                 {
                     'index': index,
-                    'data': ret
+                    'success': False,
+                    'data': _get_error()
                 }
             )
+            # 不再执行新的任务，清空参数队列，其他进程执行完当前任务后退出
+            if not skip_exception:
+                while True:
+                    try:
+                        q_param.get(block=False)
+                    except queue.Empty:
+                        break
+                break
+        _release_shared_memory()
+
+
+# 当前异常的 (错误信息, 错误栈)
+def _get_error():
+    exc_type, exc_value = sys.exc_info()[:2]
+    return traceback.format_exception_only(exc_type, exc_value)[-1].strip(), traceback.format_exc()
+
+
+# 任务执行失败的记录
+class TaskError():
+    def __init__(self, index: int, error: str, traceback: str = None, attempts: int = 1):
+        '''
+        :param index: 任务在params中的索引
+        :param error: 错误信息，例如 'ValueError: bad value'、'timeout after 10s'
+        :param traceback: 子进程中的错误栈，超时或进程退出时为None
+        :param attempts: 执行次数，包括重试
+        '''
+        self.index = index
+        self.error = error
+        self.traceback = traceback
+        self.attempts = attempts
+
+    def __repr__(self):
+        return 'TaskError(index={index}, error={error}, attempts={attempts})'.format(
+            index=self.index,
+            error=repr(self.error),
+            attempts=self.attempts,
+        )
+
+    def __str__(self):
+        if self.traceback:
+            return self.traceback
+        return 'index={index} attempts={attempts} {error}'.format(
+            index=self.index,
+            attempts=self.attempts,
+            error=self.error,
+        )
+
+    def to_dict(self) -> dict:
+        return dict(
+            index=self.index,
+            error=self.error,
+            traceback=self.traceback,
+            attempts=self.attempts,
+        )
+
+
+# 常驻进程工作者，循环执行任务，直到收到None或执行的任务数量达到max_tasks
+def _pool_loop(conn, max_tasks: int = None):
+    '''
+    :param conn: 与主进程通信的管道
+    :param max_tasks: 执行任务数量上限 None:无上限
+    消息格式：
+        ('func', func)      默认执行函数，每个进程只发送一次
+        ('tasks', [(index, func, param), ...])  一批任务，func为None时使用默认执行函数
+        None                退出
+    '''
+    default_func = None
+    num = 0
+    while True:
+        try:
+            message = conn.recv()
+        except EOFError:
+            break
+        if message is None:
+            break
+        kind, data = message
+        if kind == 'func':
+            default_func = data
+            continue
+        results = []
+        for index, func, param in data:
+            try:
+                results.append((index, True, (func or default_func)(**_resolve_param(param))))
+            except Exception:
+                results.append((index, False, _get_error()))
+        try:
+            conn.send(results)
+        except Exception:
+            # 结果无法序列化
+            error = _get_error()
+            conn.send([(index, False, error) for index, func, param in data])
+        results = None
+        _release_shared_memory()
+        num += len(data)
+        if max_tasks and num >= max_tasks:
+            break
+    conn.close()
+
+
+# 常驻进程
+class _Worker():
+    def __init__(self, max_tasks: int = None):
+        _ensure_resource_tracker()
+        self.conn, child_conn = Pipe()
+        # 不使用守护进程，任务中可以再创建子进程，由Pool.shutdown或退出时的_stop_workers关闭
+        self.process = Process(target=_pool_loop, kwargs={'conn': child_conn, 'max_tasks': max_tasks})
+        self.process.start()
+        child_conn.close()
+        self.chunk = None  # 正在执行的一批任务
+        self.deadline = None  # 正在执行的一批任务的超时时刻
+        self.func = None  # 已经发送给进程的默认执行函数
+        self.num = 0  # 已经执行的任务数量
+
+    # 关闭进程
+    def stop(self, timeout: float = 1):
+        try:
+            self.conn.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.conn.close()
+
+
+# 关闭全部常驻进程，Pool被回收或解释器退出时调用，不引用Pool本身
+def _stop_workers(workers: list):
+    for worker in workers:
+        worker.stop()
+    workers.clear()
+
+
+# 常驻进程池，多次调用之间保留进程与已经导入的模块
+class Pool():
+    '''
+    例如：
+        with Pool(p_num=4, max_tasks=1000) as pool:
+            results = pool.map(params=[{'x': 1}, {'x': 2}], func=func)
+    '''
+
+    def __init__(self, p_num: int = 4, max_tasks: int = None):
+        '''
+        :param p_num: 进程数
+        :param max_tasks: 每个进程执行任务数量上限，达到上限后替换为新的进程 None:无上限
+        '''
+        if p_num < 1:
+            raise exception.ParamException('p_num must >= 1')
+        self.p_num = p_num
+        self.max_tasks = max_tasks
+        self.closed = False
+        self.lock = threading.Lock()  # 同一时间只执行一个map
+        self.owner = None  # 持有lock的线程
+        self.workers = [_Worker(max_tasks) for i in range(p_num)]
+        # 没有调用shutdown时，在Pool被回收或解释器退出（早于multiprocessing等待子进程）时关闭进程
+        self._finalizer = weakref.finalize(self, _stop_workers, self.workers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        self.shutdown()
 
+    # 获取lock，其他线程等待，同一线程在as_completed迭代中再次调用时抛出异常，避免死锁
+    def _acquire(self):
+        if self.owner == threading.get_ident():
+            raise exception.ExecuteException('Pool is busy')
+        self.lock.acquire()
+        self.owner = threading.get_ident()
 
-# 进程装饰器
+    def _release(self):
+        self.owner = None
+        self.lock.release()
+
+    # 关闭全部进程
+    def shutdown(self):
+        self._acquire()
+        try:
+            if self.closed:
+                return
+            self.closed = True
+            self._finalizer()
+        finally:
+            self._release()
+
+    # 标准化参数并分批，得到[(index, func, param), ...]，func为None时使用默认执行函数，不修改原参数
+    @staticmethod
+    def _get_chunks(params, func=None, chunk_size: int = 1):
+        chunk = []
+        for index, param in enumerate(params):
+            task_func = param.get('func')
+            if task_func is None and func is None:
+                msg = 'No func to execute'
+                raise exception.ParamException(msg)
+            chunk.append((index, task_func, {key: value for key, value in param.items() if key != 'func'}))
+            if len(chunk) >= chunk_size:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    # 接收进程的结果，进程已经退出时返回None
+    @staticmethod
+    def _recv(worker: _Worker):
+        if not worker.conn.poll():
+            return None
+        try:
+            return worker.conn.recv()
+        except EOFError:
+            return None
+
+    # 替换退出的进程（达到任务数量上限或异常退出）
+    def _replace_worker(self, worker: _Worker) -> _Worker:
+        worker.process.join()
+        worker.conn.close()
+        new_worker = _Worker(self.max_tasks)
+        self.workers[self.workers.index(worker)] = new_worker
+        return new_worker
+
+    # 按照完成顺序返回结果
+    def as_completed(
+            self,
+            params,
+            func=None,
+            skip_exception: bool = False,
+            chunk_size: int = 1,
+            timeout: float = None,
+            retries: int = 0,
+            cancel=None
+    ):
+        '''
+        :param params: 参数序列 [dict,dict....]，可以是生成器，按需读取，不会一次展开
+        :param func: 执行函数，每个进程只发送一次
+            函数地址如果在params中，func可以为None
+            优先级: params[<index>]['func'] >> func
+        :param skip_exception: 出现异常是否终止
+            True:   出现异常，这个任务的结果为TaskError
+            False:  出现异常，不再分配新的任务，返回执行中的任务结果后抛出ExecuteException
+        :param chunk_size: 每次发送给进程的任务数量
+        :param timeout: 每个任务的超时时间（秒），一批任务的超时时间为timeout * 任务数量
+            超时的进程被终止并替换为新的进程，这一批任务均视为失败 None:不超时
+        :param retries: 失败（异常、超时、进程退出）后的重试次数，重试的任务单独发送
+        :param cancel: 用于取消的连接（multiprocessing.Pipe的读取端），可读时终止执行中的进程并结束生成器
+            可以在其他线程中发送，不需要等待执行中的任务完成 None:不取消
+        :return: 生成器 (index, result)，index为params中的索引
+        例如：
+            for index, result in pool.as_completed(params=({'x': x} for x in range(10 ** 8)), func=func):
+                ...
+        '''
+        self._acquire()
+        try:
+            if self.closed:
+                raise exception.ExecuteException('Pool is shutdown')
+            chunks = self._get_chunks(params, func, chunk_size)
+            chunk = next(chunks, None)
+            retry_chunks = deque()  # 需要重试的任务
+            attempts = {}  # index -> 失败次数
+            error = None
+            for worker in list(self.workers):
+                if not worker.process.is_alive():
+                    self._replace_worker(worker)
+            idle = list(self.workers)
+            busy = []
+            try:
+                while busy or ((retry_chunks or chunk is not None) and error is None):
+                    # 分配任务给空闲的进程，执行中的任务不超过进程数量，优先重试
+                    while idle and (retry_chunks or chunk is not None) and error is None:
+                        worker = idle.pop()
+                        if retry_chunks:
+                            worker.chunk = retry_chunks.popleft()
+                        else:
+                            worker.chunk = chunk
+                            chunk = next(chunks, None)
+                        if timeout is not None:
+                            worker.deadline = time.monotonic() + timeout * len(worker.chunk)
+                        busy.append(worker)
+                        if func is not None and worker.func is not func:
+                            worker.conn.send(('func', func))
+                            worker.func = func
+                        worker.conn.send(('tasks', worker.chunk))
+                    # 等待结果、进程退出、超时或取消，不轮询
+                    deadlines = [worker.deadline for worker in busy if worker.deadline is not None]
+                    wait(
+                        [worker.conn for worker in busy] + [worker.process.sentinel for worker in busy] + (
+                            [cancel] if cancel is not None else []),
+                        max(min(deadlines) - time.monotonic(), 0) if deadlines else None
+                    )
+                    if cancel is not None and cancel.poll():
+                        for worker in busy:
+                            worker.process.terminate()
+                            self._replace_worker(worker)
+                        return
+                    now = time.monotonic()
+                    for worker in list(busy):
+                        messages = self._recv(worker)
+                        failure = None
+                        if messages is not None:
+                            worker.num += len(messages)
+                        elif worker.deadline is not None and now >= worker.deadline:
+                            worker.process.terminate()
+                            failure = 'timeout after {timeout}s'.format(timeout=timeout * len(worker.chunk))
+                        elif worker.process.is_alive():
+                            continue
+                        else:
+                            failure = 'worker exited with code {code}'.format(code=worker.process.exitcode)
+                        # 超时或进程退出，正在执行的一批任务均失败
+                        if failure is not None:
+                            messages = [(task[0], False, (failure, None)) for task in worker.chunk]
+                        tasks = {task[0]: task for task in worker.chunk}
+                        worker.chunk = None
+                        worker.deadline = None
+                        busy.remove(worker)
+                        # 达到任务数量上限、超时或异常退出的进程替换为新的进程
+                        if failure is not None or (self.max_tasks and worker.num >= self.max_tasks):
+                            worker = self._replace_worker(worker)
+                        idle.append(worker)
+                        for index, success, data in messages:
+                            if success:
+                                yield index, data
+                                continue
+                            num = attempts.pop(index, 0) + 1
+                            if num <= retries:
+                                attempts[index] = num
+                                retry_chunks.append([tasks[index]])
+                                continue
+                            task_error = TaskError(index, data[0], data[1], num)
+                            if skip_exception:
+                                yield index, task_error
+                            elif error is None:
+                                error = task_error
+            # 异常中断或提前关闭生成器时，正在执行任务的进程替换为新的进程，避免下一次调用收到过期的结果
+            except BaseException:
+                for worker in busy:
+                    worker.process.terminate()
+                    self._replace_worker(worker)
+                raise
+            if error is not None:
+                raise exception.ExecuteException(str(error))
+        finally:
+            self._release()
+
+    # 执行全部任务
+    def map(
+            self,
+            params,
+            func=None,
+            skip_exception: bool = False,
+            chunk_size: int = None,
+            timeout: float = None,
+            retries: int = 0
+    ) -> list:
+        '''
+        :param params: 参数序列 [dict,dict....]
+        :param func: 执行函数，每个进程只发送一次
+            函数地址如果在params中，func可以为None
+            优先级: params[<index>]['func'] >> func
+        :param skip_exception: 出现异常是否终止
+            True:   出现异常，这个任务的结果为TaskError
+            False:  出现异常，不再分配新的任务，等待执行中的任务完成后抛出ExecuteException
+        :param chunk_size: 每次发送给进程的任务数量 None:根据任务数量与进程数自动计算，设置timeout时为1
+        :param timeout: 每个任务的超时时间（秒），同as_completed
+        :param retries: 失败后的重试次数，同as_completed
+        :return
+            [result、result... ...] 结果按照params的索引对应
+        '''
+        if chunk_size is None:
+            chunk_size = 1 if timeout is not None else max(1, len(params) // (self.p_num * 4))
+        results = [None] * len(params)
+        for index, data in self.as_completed(params, func, skip_exception, chunk_size, timeout, retries):
+            results[index] = data
+        return results
+
+
+# 被装饰函数的引用，模块级函数只传递模块与名称，子进程中重新导入，避免序列化装饰后的同名函数
+def _get_func_ref(func):
+    if '<locals>' in getattr(func, '__qualname__', '<locals>'):
+        return func
+    return func.__module__, func.__qualname__
+
+
+# 在子进程中执行被装饰的函数，参数中的共享内存对象转换为只读视图
+def _call_func_ref(func_ref, args: tuple, kwargs: dict):
+    if isinstance(func_ref, tuple):
+        module, qualname = func_ref
+        func = importlib.import_module(module)
+        for name in qualname.split('.'):
+            func = getattr(func, name)
+        func = getattr(func, '__process_wrapped__', func)
+    else:
+        func = func_ref
+    # 进程池中的进程会执行多个任务，释放上一个任务连接的共享内存
+    _release_shared_memory()
+    args = [value.get() if isinstance(value, (SharedArray, SharedFrame)) else value for value in args]
+    return func(*args, **_resolve_param(dict(kwargs)))
+
+
+# 进程装饰器，函数在新的子进程中执行，返回进程对象
 def process_wrapper(func):
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        process_target = Process(target=func, args=args, kwargs=kwargs)
-        process_target.run()
+        _ensure_resource_tracker()
+        process_target = Process(target=_call_func_ref, args=(_get_func_ref(func), args, kwargs))
+        process_target.start()
         return process_target
 
+    wrapper.__process_wrapped__ = func
     return wrapper
 
 
+# 进程装饰器使用的进程池 p_num -> ProcessPoolExecutor
+_executors = {}
+_executors_lock = threading.Lock()
+
+
+# 获取进程装饰器使用的进程池，相同的进程数共用一个进程池
+def get_executor(p_num: int = 4) -> ProcessPoolExecutor:
+    '''
+    :param p_num: 进程数
+    子进程异常退出后进程池不可再用（_broken），这时关闭并创建新的进程池
+    '''
+    with _executors_lock:
+        executor = _executors.get(p_num)
+        if executor is not None and executor._broken:
+            executor.shutdown(wait=False)
+            executor = None
+        if executor is None:
+            _ensure_resource_tracker()
+            executor = ProcessPoolExecutor(max_workers=p_num)
+            _executors[p_num] = executor
+        return executor
+
+
+# 关闭进程装饰器使用的全部进程池
+def shutdown_executors(wait: bool = True):
+    '''
+    :param wait: 是否等待执行中的任务完成
+    '''
+    with _executors_lock:
+        executors = list(_executors.values())
+        _executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=wait)
+
+
+# 进程装饰器，提交到进程池后台执行，返回Future
+def process_future_wrapper(func=None, p_num: int = 4, executor: ProcessPoolExecutor = None):
+    '''
+    :param func: 执行函数，需要定义在模块中
+    :param p_num: 进程数，相同的进程数共用一个进程池
+    :param executor: 指定的进程池 None:使用get_executor(p_num)
+    :return: 装饰后的函数，调用时返回concurrent.futures.Future
+        future.result(timeout=None) 等待结果，函数中的异常在这里抛出
+        future.done()               是否执行完成
+        future.exception()          函数中的异常
+        在asyncio中: await asyncio.wrap_future(future)
+    结果通过序列化返回，较大的numpy数组或DataFrame参数可以使用share()通过共享内存传递
+    例如：
+        @process_future_wrapper(p_num=4)
+        def get_indicator(df, n):
+            ...
+
+        future = get_indicator(share(df), n=20)
+        indicator = future.result(timeout=60)
+    '''
+
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs) -> Future:
+            func_ref = _get_func_ref(func)
+            if executor is not None:
+                return executor.submit(_call_func_ref, func_ref, args, kwargs)
+            try:
+                return get_executor(p_num).submit(_call_func_ref, func_ref, args, kwargs)
+            # 获取后进程池才损坏时，重新获取一次
+            except BrokenProcessPool:
+                return get_executor(p_num).submit(_call_func_ref, func_ref, args, kwargs)
+
+        wrapper.__process_wrapped__ = func
+        return wrapper
+
+    if func is not None:
+        return decorator(func)
+    return decorator
+
+
 def pool_worker(
         params,
         p_num=4,
         func=None,
-        skip_exception=False
+        skip_exception=False,
+        pool: Pool = None,
+        transport: str = 'manager',
+        chunk_size: int = None,
+        timeout: float = None,
+        retries: int = 0
 ):
     '''
     :param params: 参数序列 [dict,dict....]
@@ -63,12 +704,35 @@ def pool_worker(
     :param func: 执行函数
         函数地址如果在params中，func可以为None
         优先级: params[<index>]['func'] >> func
-    :param skip_exception: 子进程中出现异常是否终止
-        True:   出现异常，报告错误信息，不会终止子进程
-        False:  出现异常，终止子进程
+    :param skip_exception: 出现异常是否终止，各种transport与pool相同，同Pool.map
+        True:   出现异常（包括进程异常退出），这个任务的结果为TaskError，继续执行其他任务
+        False:  出现异常，不再执行新的任务，等待执行中的任务完成后抛出ExecuteException
+    :param pool: 常驻进程池，不为None时使用pool中的进程执行，忽略p_num
+    :param transport: 任务与结果的传输方式
+        manager:    Manager队列，每个任务一次跨进程调用
+        pipe:       管道，任务分批发送，func每个进程只发送一次
+        Manager队列不支持chunk_size、timeout与retries，设置其中任意一个时使用pipe，异常处理不变
+    :param chunk_size: 每次发送给进程的任务数量 None:自动计算
+    :param timeout: 每个任务的超时时间（秒），同Pool.map
+    :param retries: 失败后的重试次数，同Pool.map
     :return
         [result、result... ...]
     '''
+    kwargs = dict(
+        params=params,
+        func=func,
+        skip_exception=skip_exception,
+        chunk_size=chunk_size,
+        timeout=timeout,
+        retries=retries,
+    )
+    if transport not in ['manager', 'pipe']:
+        raise exception.ParamException('transport must in ["manager","pipe"]')
+    if pool is not None:
+        return pool.map(**kwargs)
+    if transport == 'pipe' or chunk_size is not None or timeout is not None or retries:
+        with Pool(p_num=max(p_num, 1)) as pool:
+            return pool.map(**kwargs)
     # 结果按照params的索引对应
     results = [None] * len(params)
     # 标准化param，让param中存在要执行的函数func
@@ -95,34 +759,189 @@ def pool_worker(
                 'skip_exception': skip_exception
             }
         )
+    exitcodes = []  # 异常退出的进程的退出码
     # 单进程运行
     if p_num <= 1:
         _pool_worker(q_param, q_result)
     # 多进程运行
     else:
         processes = []
+        _ensure_resource_tracker()
         for i in range(p_num):
             p = Process(target=_pool_worker, kwargs={'q_param': q_param, 'q_result': q_result})
             processes.append(p)
             p.start()
 
-        def wait_processes(processes):
-            for p in processes:
-                if p.is_alive():
-                    return False
-            return True
-
         # 等待进程均运行完成
-        while True:
-            if wait_processes(processes):
-                break
-            else:
-                time.sleep(0.15)
-    # 整理结果
+        for p in processes:
+            p.join()
+        exitcodes = [p.exitcode for p in processes if p.exitcode]
+    # 整理结果，按照索引赋值
+    done = set()
+    error = None
     for i in range(q_result.qsize()):
-        result = q_result.get(block=False, timeout=0)
+        result = q_result.get(block=False)
         index = result['index']
-        data = result['data']
-        # 按照索引赋值，如果某个参数执行异常并且skip_exception，这个结果为None
-        results[index] = data
+        done.add(index)
+        if result['success']:
+            results[index] = result['data']
+            continue
+        task_error = TaskError(index, result['data'][0], result['data'][1])
+        if skip_exception:
+            results[index] = task_error
+        elif error is None or index < error.index:
+            error = task_error
+    if error is not None:
+        raise exception.ExecuteException(str(error))
+    # 进程异常退出，没有返回结果的任务
+    if exitcodes and len(done) < len(results):
+        failure = 'worker exited with code {codes}'.format(codes=','.join(map(str, exitcodes)))
+        if not skip_exception:
+            raise exception.ExecuteException(failure)
+        for index in range(len(results)):
+            if index not in done:
+                results[index] = TaskError(index, failure)
     return results
+
+
+# 按照完成顺序返回结果的pool_worker
+def pool_worker_iter(
+        params,
+        p_num=4,
+        func=None,
+        skip_exception=False,
+        chunk_size: int = 1,
+        pool: Pool = None,
+        timeout: float = None,
+        retries: int = 0,
+        cancel=None
+):
+    '''
+    :param params: 参数序列 [dict,dict....]，可以是生成器，按需读取
+    :param p_num: 进程数
+    :param func: 执行函数
+    :param skip_exception: 出现异常是否终止，同Pool.as_completed
+    :param chunk_size: 每次发送给进程的任务数量
+    :param timeout: 每个任务的超时时间（秒），同Pool.as_completed
+    :param retries: 失败后的重试次数，同Pool.as_completed
+    :param pool: 常驻进程池 None:创建临时进程池，生成器结束时关闭
+    :param cancel: 用于取消的连接，同Pool.as_completed
+    :return: 生成器 (index, result)
+    例如：
+        for index, result in pool_worker_iter(params=({'x': x} for x in range(1000)), p_num=4, func=func):
+            ...
+    '''
+    if pool is not None:
+        yield from pool.as_completed(params, func, skip_exception, chunk_size, timeout, retries, cancel)
+        return
+    with Pool(p_num=max(p_num, 1)) as pool:
+        yield from pool.as_completed(params, func, skip_exception, chunk_size, timeout, retries, cancel)
+
+
+# 异步执行pool_worker，在线程中等待进程池，不阻塞事件循环
+async def async_pool_worker(
+        params,
+        p_num=4,
+        func=None,
+        skip_exception=False,
+        pool: Pool = None,
+        chunk_size: int = None,
+        timeout: float = None,
+        retries: int = 0
+) -> list:
+    '''
+    :param params: 参数序列 [dict,dict....]
+    :param p_num: 进程数，pool为None时创建临时进程池
+    :param func: 执行函数
+    :param skip_exception: 出现异常是否终止，同Pool.map
+    :param pool: 常驻进程池
+    :param chunk_size: 每次发送给进程的任务数量 None:自动计算
+    :param timeout: 每个任务的超时时间（秒）
+    :param retries: 失败后的重试次数
+    :return
+        [result、result... ...] 结果按照params的索引对应
+    例如：
+        results = await async_pool_worker(params=params, func=func, pool=pool)
+    '''
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(
+        pool_worker,
+        params=params,
+        p_num=p_num,
+        func=func,
+        skip_exception=skip_exception,
+        pool=pool,
+        transport='pipe',
+        chunk_size=chunk_size,
+        timeout=timeout,
+        retries=retries,
+    ))
+
+
+# 异步迭代pool_worker_iter的结果，按照完成顺序返回
+async def async_pool_worker_iter(
+        params,
+        p_num=4,
+        func=None,
+        skip_exception=False,
+        chunk_size: int = 1,
+        pool: Pool = None,
+        timeout: float = None,
+        retries: int = 0,
+        buffer_size: int = 1024
+):
+    '''
+    :param params: 参数序列 [dict,dict....]，可以是生成器，按需读取
+    :param p_num: 进程数，pool为None时创建临时进程池
+    :param func: 执行函数
+    :param skip_exception: 出现异常是否终止，同Pool.as_completed
+    :param chunk_size: 每次发送给进程的任务数量
+    :param pool: 常驻进程池
+    :param timeout: 每个任务的超时时间（秒）
+    :param retries: 失败后的重试次数
+    :param buffer_size: 未被读取的结果数量上限，达到上限时暂停接收结果
+    :return: 异步生成器 (index, result)
+    例如：
+        async for index, result in async_pool_worker_iter(params=params, func=func, pool=pool):
+            ...
+    '''
+    loop = asyncio.get_running_loop()
+    queue = asyncio.Queue(maxsize=buffer_size)
+    stop = threading.Event()
+    # 提前结束时通知进程池终止执行中的进程，不等待正在执行的任务完成
+    cancel_r, cancel_w = Pipe(duplex=False)
+    done = object()
+
+    def produce():
+        results = pool_worker_iter(params, p_num, func, skip_exception, chunk_size, pool, timeout, retries, cancel_r)
+        try:
+            for item in results:
+                if stop.is_set():
+                    break
+                asyncio.run_coroutine_threadsafe(queue.put((True, item)), loop).result()
+            item = (True, done)
+        except BaseException as e:
+            item = (False, e)
+        finally:
+            results.close()
+        if not stop.is_set():
+            asyncio.run_coroutine_threadsafe(queue.put(item), loop).result()
+
+    producer = loop.run_in_executor(None, produce)
+    try:
+        while True:
+            success, item = await queue.get()
+            if not success:
+                raise item
+            if item is done:
+                break
+            yield item
+    finally:
+        stop.set()
+        cancel_w.send(None)
+        # 释放等待放入结果的线程
+        while not queue.empty():
+            queue.get_nowait()
+        await producer
+        cancel_r.close()
+        cancel_w.close()
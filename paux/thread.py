@@ -1,4 +1,6 @@
 from threading import Thread
+from concurrent.futures import Future
+import asyncio
 import inspect
 import ctypes
 
@@ -33,3 +35,42 @@ def thread_wrapper(func):
         return thread_target
 
     return wrapper
+
+
+# 线程装饰器，返回Future，可以获取结果或异常
+def future_wrapper(func):
+    '''
+    例如：
+        future = future_wrapper(func)(x=1)
+        future.result(timeout=10)
+        在asyncio中: await asyncio.wrap_future(future)
+    '''
+
+    def wrapper(*args, **kwargs) -> Future:
+        future = Future()
+
+        def run():
+            if not future.set_running_or_notify_cancel():
+                return
+            try:
+                future.set_result(func(*args, **kwargs))
+            except BaseException as e:
+                future.set_exception(e)
+
+        Thread(target=run, daemon=True).start()
+        return future
+
+    return wrapper
+
+
+# 线程装饰器，在asyncio中await函数的结果，函数在新线程中执行，不阻塞事件循环
+def async_thread_wrapper(func):
+    '''
+    例如：
+        result = await async_thread_wrapper(func)(x=1)
+    '''
+
+    async def wrapper(*args, **kwargs):
+        return await asyncio.wrap_future(future_wrapper(func)(*args, **kwargs))
+
+    return wrapper
@@ -19,7 +19,9 @@ REQUIRED = [
     'redis'
 ]
 
-EXTRAS = {}
+EXTRAS = {
+    'zoneinfo': ['backports.zoneinfo; python_version < "3.9"', 'tzdata'],
+}
 
 here = os.path.abspath(os.path.dirname(__file__))
 try:
@@ -0,0 +1,14 @@
+import time
+import pytest
+
+
+# 将进程的本地时区设置为非UTC时区，用于检查无时区日期时间按照本地时间计算
+@pytest.fixture
+def local_timezone(monkeypatch):
+    if not hasattr(time, 'tzset'):
+        pytest.skip('time.tzset is not available')
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    yield 'America/New_York'
+    monkeypatch.undo()
+    time.tzset()
@@ -0,0 +1,34 @@
+import datetime
+import numpy as np
+import pandas as pd
+from paux import date
+
+NAIVE = [
+    datetime.datetime(2021, 1, 1, 12),
+    datetime.datetime(2021, 3, 14, 3, 30),
+    datetime.datetime(2021, 7, 1, 12),
+    datetime.datetime(2021, 11, 7, 1, 30),
+]
+
+
+# 无时区的datetime按照本地时间计算，与to_ts相同，结果不随容器类型变化
+def test_naive_datetime_parity(local_timezone):
+    expected = [date.to_ts(value) for value in NAIVE]
+    assert expected[0] == 1609520400000
+    for dates in [NAIVE, tuple(NAIVE), iter(NAIVE), np.array(NAIVE, dtype=object)]:
+        assert date.to_ts_array(dates).tolist() == expected
+
+
+# 混合类型逐元素与to_ts相同
+def test_mixed_parity(local_timezone):
+    dates = [NAIVE[0], '2021-03-14 02:30:00', 1609520400000, 0, None, datetime.date(2021, 11, 7), '']
+    timezone = 'America/Sao_Paulo'
+    expected = [date.to_ts(value, timezone, default=-1) for value in dates]
+    assert date.to_ts_array(dates, timezone, default=-1).tolist() == expected
+
+
+# datetime64数据按照UTC计算
+def test_datetime64_is_utc(local_timezone):
+    values = np.array(['2021-01-01T12:00'], dtype='datetime64[ms]')
+    assert date.to_ts_array(values).tolist() == [1609502400000]
+    assert date.to_ts_array(pd.Series(values)).tolist() == [1609502400000]
@@ -0,0 +1,72 @@
+import pytest
+from paux import date
+
+# 夏令时切换当天及前后的本地时间，包含不存在（跳过）与重复的时间
+CASES = {
+    'America/New_York': [
+        '2021-03-13', '2021-03-14', '2021-03-14 01:30:00', '2021-03-14 02:30:00', '2021-03-14 03:30:00',
+        '2021-11-06', '2021-11-07', '2021-11-07 00:30:00', '2021-11-07 01:30:00', '2021-11-07 02:30:00',
+        '03/14/2021 03',
+    ],
+    'Europe/London': [
+        '2021-03-27', '2021-03-28', '2021-03-28 00:30:00', '2021-03-28 01:30:00', '2021-03-28 02:30:00',
+        '2021-10-30', '2021-10-31', '2021-10-31 00:30:00', '2021-10-31 01:30:00', '2021-10-31 02:30:00',
+    ],
+    # 切换间隔为30分钟
+    'Australia/Lord_Howe': [
+        '2021-04-03', '2021-04-04', '2021-04-04 01:15:00', '2021-04-04 01:45:00', '2021-04-04 02:15:00',
+        '2021-10-02', '2021-10-03', '2021-10-03 01:45:00', '2021-10-03 02:15:00', '2021-10-03 02:45:00',
+    ],
+    # 在零点切换，2018-11-04 00:00不存在，2019-02-16 23:00重复
+    'America/Sao_Paulo': [
+        '2018-11-03', '2018-11-04', '2018-11-04 00:30:00', '2018-11-04 01:30:00',
+        '2019-02-16', '2019-02-16 22:30:00', '2019-02-16 23:30:00', '2019-02-17', '2019-02-17 00:30:00',
+    ],
+}
+
+
+def _get_results(backend: str, timezone: str) -> list:
+    date.set_backend(backend)
+    date.clear_cache()
+    try:
+        results = []
+        for value in CASES[timezone]:
+            ts = date.to_ts(value, timezone)
+            dt = date.to_datetime(value, timezone)
+            results.append((
+                value,
+                ts,
+                int(dt.timestamp() * 1000),
+                date.to_fmt(value, timezone, '%Y-%m-%d %H:%M:%S %z'),
+                date.to_fmt(ts, timezone, '%Y-%m-%d %H:%M:%S %z'),
+                date.to_ts(date.tomorrow(value, timezone), timezone),
+                date.get_tomorrow_ts(value, timezone),
+                date.get_day_ms(value, timezone),
+                date.get_month_days(dt.year, dt.month, timezone),
+            ))
+        return results
+    finally:
+        date.set_backend('pendulum')
+        date.clear_cache()
+
+
+@pytest.mark.skipif(date.zoneinfo is None, reason='zoneinfo is not available')
+@pytest.mark.parametrize('timezone', list(CASES.keys()))
+def test_backend_parity(timezone):
+    assert _get_results('pendulum', timezone) == _get_results('zoneinfo', timezone)
+
+
+@pytest.mark.skipif(date.zoneinfo is None, reason='zoneinfo is not available')
+@pytest.mark.parametrize('backend', ['pendulum', 'zoneinfo'])
+def test_transition_day_length(backend):
+    date.set_backend(backend)
+    date.clear_cache()
+    try:
+        assert date.get_day_ms('2021-03-14', 'America/New_York') == 23 * 3600000
+        assert date.get_day_ms('2021-11-07', 'America/New_York') == 25 * 3600000
+        assert date.get_day_ms('2021-04-04', 'Australia/Lord_Howe') == 24 * 3600000 + 1800000
+        assert date.get_day_ms('2021-10-03', 'Australia/Lord_Howe') == 24 * 3600000 - 1800000
+        assert date.get_day_ms('2018-11-04', 'America/Sao_Paulo') == 23 * 3600000
+    finally:
+        date.set_backend('pendulum')
+        date.clear_cache()
@@ -0,0 +1,29 @@
+import datetime
+from paux import date
+
+NAIVE = [
+    datetime.datetime(2021, 1, 1, 12),
+    datetime.datetime(2021, 3, 13, 2, 30),
+    datetime.datetime(2021, 3, 14, 12),
+    datetime.datetime(2021, 7, 1, 12),
+    datetime.datetime(2021, 11, 6, 1, 30),
+    datetime.datetime(2021, 11, 7, 12),
+]
+
+
+# 批量版本与单个版本相同，无时区的datetime按照本地时间计算
+def test_naive_datetime_parity(local_timezone):
+    assert date.get_tomorrow_ts_array(NAIVE).tolist() == [date.get_tomorrow_ts(value) for value in NAIVE]
+    assert date.get_day_ms_array(NAIVE).tolist() == [date.get_day_ms(value) for value in NAIVE]
+    assert date.get_tomorrow_ts_array(NAIVE)[0] == 1609606800000
+
+
+def test_timezone_parity(local_timezone):
+    timezone = 'Australia/Lord_Howe'
+    dates = ['2021-04-03 01:45:00', '2021-04-04', '2021-10-02 02:15:00', '2021-10-03', NAIVE[0]]
+    assert date.get_tomorrow_ts_array(dates, timezone).tolist() == [
+        date.get_tomorrow_ts(value, timezone) for value in dates]
+    assert date.get_day_ms_array(dates, timezone).tolist() == [date.get_day_ms(value, timezone) for value in dates]
+    years, months = [2020, 2021, 2021, 2021], [2, 3, 4, 10]
+    assert date.get_month_days_array(years, months, timezone).tolist() == [
+        date.get_month_days(year, month, timezone) for year, month in zip(years, months)]
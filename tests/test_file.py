@@ -0,0 +1,30 @@
+import pytest
+from paux import exception
+from paux.file import normalize_ts_csv
+
+CSV = 'date,v\n1609520400000,a\n2021-01-01 12:00:00,b\n1609520400000.0,c\n,d\n2021-01-02,e\n'
+
+
+# 结果与chunk_size无关，数字字符串按照毫秒时间戳处理
+def test_normalize_ts_csv_chunk_size(tmp_path):
+    src = tmp_path / 'src.csv'
+    src.write_text(CSV)
+    outputs = set()
+    for chunk_size in [1, 2, 3, 4, 100]:
+        dst = tmp_path / 'dst_{n}.csv'.format(n=chunk_size)
+        assert normalize_ts_csv(str(src), str(dst), ['date'], timezone='UTC', default=-1, chunk_size=chunk_size) == 5
+        outputs.add(dst.read_text())
+    assert outputs == {
+        'date,v\n1609520400000,a\n1609502400000,b\n1609520400000,c\n-1,d\n1609545600000,e\n'}
+
+
+# 转换失败时不修改dst，也不留下临时文件
+def test_normalize_ts_csv_failure_keeps_dst(tmp_path):
+    src = tmp_path / 'src.csv'
+    src.write_text('date,v\n1609520400000,a\nbad,b\n')
+    dst = tmp_path / 'dst.csv'
+    dst.write_text('old')
+    with pytest.raises(exception.DatePatternException):
+        normalize_ts_csv(str(src), str(dst), ['date'], chunk_size=1)
+    assert dst.read_text() == 'old'
+    assert sorted(path.name for path in tmp_path.iterdir()) == ['dst.csv', 'src.csv']
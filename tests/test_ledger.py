@@ -0,0 +1,29 @@
+import pytest
+from paux import exception
+from paux.ledger import Ledger
+
+
+# 浮点数量的部分平仓与全部平仓
+def test_float_quantity():
+    ledger = Ledger()
+    ledger.add_fill('BTCUSDT', 'LONG', 'OPEN', 100, 0.3)
+    ledger.add_fill('BTCUSDT', 'LONG', 'CLOSE', 110, 0.1)
+    ledger.add_fill('BTCUSDT', 'LONG', 'CLOSE', 110, 0.2)
+    position = ledger.get_position('BTCUSDT', 'LONG')
+    assert position['quantity'] == 0 and position['avgPrice'] == 0
+    assert position['realizedPnl'] == pytest.approx(3)
+
+
+# 参数错误或没有持仓时不留下空的持仓
+def test_no_phantom_position():
+    ledger = Ledger()
+    with pytest.raises(exception.ParamException):
+        ledger.add_fill('BTCUSDT', 'LONG', 'BUY', 100, 1)
+    with pytest.raises(exception.ParamException):
+        ledger.add_fill('BTCUSDT', 'LONG', 'OPEN', 100, 0)
+    with pytest.raises(exception.PosSideException):
+        ledger.add_fill('BTCUSDT', 'BOTH', 'OPEN', 100, 1)
+    with pytest.raises(exception.ExecuteException):
+        ledger.add_fill('BTCUSDT', 'SHORT', 'CLOSE', 100, 1)
+    assert ledger.get_position('ETHUSDT', 'long')['quantity'] == 0
+    assert ledger.get_positions() == []
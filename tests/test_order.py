@@ -0,0 +1,13 @@
+from paux import order
+
+
+# 间隔可以是数字，结果与对应的字符串相同
+def test_numeric_size():
+    assert order.price_to_f(5.0, 1)['data'] == '5'
+    assert order.quantity_to_f(3, 10)['data'] == '3'
+    assert order.price_to_f(5.0, 1.0)['data'] == '5'
+    assert order.price_to_f(52.12, 0.01) == order.price_to_f(52.12, '0.01')
+    assert order.quantity_to_f(0.012, 0.001) == order.quantity_to_f(0.012, '0.001')
+    assert order.round_price(52.123, 'CEIL', 0.01) == order.round_price(52.123, 'CEIL', '0.01')
+    assert order.round_quantity(0.0123, 1e-3) == order.round_quantity(0.0123, '0.001')
+    assert order.get_symbol_rules(tickSize=1e-5).price_to_ticks(0.00012) == 12
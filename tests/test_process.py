@@ -0,0 +1,66 @@
+import pytest
+
+from paux import exception
+from paux.process import Pool, TaskError, pool_worker
+
+
+def add(x, y=1):
+    return x + y
+
+
+# 任务中再次使用多进程
+def nested(x):
+    return sum(pool_worker([{'x': x}, {'x': x + 1}], p_num=2, func=add))
+
+
+def test_pool_task_can_start_processes():
+    with Pool(p_num=2) as pool:
+        assert pool.map([{'x': 1}, {'x': 5}], func=nested) == [5, 13]
+
+
+# Manager队列与pipe的异常处理相同
+@pytest.mark.parametrize('transport', ['manager', 'pipe'])
+@pytest.mark.parametrize('p_num', [1, 2])
+def test_pool_worker_errors(transport, p_num):
+    params = [{'x': 1}, {'x': 'a'}, {'x': 3}]
+    results = pool_worker(params, p_num=p_num, func=add, skip_exception=True, transport=transport)
+    assert results[0] == 2 and results[2] == 4
+    assert isinstance(results[1], TaskError) and results[1].index == 1
+    with pytest.raises(exception.ExecuteException):
+        pool_worker(params, p_num=p_num, func=add, transport=transport)
+
+
+# 扩展类型的列保持原来的类型，包括空值
+def test_shared_frame_dtypes():
+    import pandas as pd
+    from paux.process import share
+    frame = pd.DataFrame(
+        {
+            'f': [1.0, 2.0, 3.0],
+            'c': pd.Categorical(['a', 'b', 'a']),
+            'i': pd.array([1, None, 3], dtype='Int64'),
+            'tz': pd.date_range('2021-01-01', periods=3, tz='America/New_York'),
+        },
+        index=pd.Index([5, 6, 7], name='k'),
+    )
+    frame.columns.name = 'field'
+    with share(frame) as shared:
+        result = shared.get()
+        assert result.dtypes.to_dict() == frame.dtypes.to_dict()
+        assert result.index.name == 'k' and result.columns.name == 'field'
+        assert result.equals(frame)
+
+
+# 任务结束后释放连接的共享内存，仍被引用的保留到下一次释放
+def test_release_shared_memory():
+    import pickle
+    import numpy as np
+    from paux import process
+    with process.share(np.arange(10.0)) as shared:
+        view = pickle.loads(pickle.dumps(shared)).get()
+        assert shared.name in process._shared_cache
+        process._release_shared_memory()
+        assert shared.name in process._shared_cache
+        del view
+        process._release_shared_memory()
+        assert shared.name not in process._shared_cache